@@ -0,0 +1,131 @@
+"""
+Every shortest path between two people, not just the first one found.
+
+A breadth-first search from the source labels each person with their
+distance, up to the target's layer. Those labels define a layered DAG:
+an edge (movie, person) into a person at distance k is on some shortest
+path iff it comes from a person at distance k - 1. Paths are then walked
+back from the target through that DAG lazily, one at a time, and counted
+with a dynamic program over the layers without being listed at all.
+
+Like constrained.py, people and movies are whatever keys the movies_of
+and stars_of callbacks take.
+"""
+
+
+def distances(source, target, movies_of, stars_of):
+    """
+    Breadth-first distances from source, stopping once the target's
+    layer is reached. Returns the dict, which lacks target if unreachable.
+    """
+    distance = {source: 0}
+    seen_movies = set()
+    layer = [source]
+    while layer and target not in distance:
+        next_layer = []
+        for person in layer:
+            d = distance[person] + 1
+            for movie in movies_of(person):
+                # the first scan of a cast labels all of it
+                if movie in seen_movies:
+                    continue
+                seen_movies.add(movie)
+                for star in stars_of(movie):
+                    if star not in distance:
+                        distance[star] = d
+                        next_layer.append(star)
+        layer = next_layer
+    return distance
+
+
+def predecessors(person, distance, movies_of, stars_of):
+    """
+    (movie, co-star) pairs one layer closer to the source than person.
+    """
+    previous = distance[person] - 1
+    for movie in movies_of(person):
+        for star in stars_of(movie):
+            if distance.get(star) == previous:
+                yield movie, star
+
+
+def all_shortest_paths(source, target, movies_of, stars_of):
+    """
+    Yields every shortest path from source to target, each as a list of
+    (movie, person) pairs. Nothing is yielded if they aren't connected.
+
+    Only the distance labels and the current path are held in memory,
+    however many paths there are.
+    """
+    distance = distances(source, target, movies_of, stars_of)
+    if target not in distance:
+        return
+    if target == source:
+        yield []
+        return
+
+    # depth-first walk back from the target: stack[i] is a person and the
+    # predecessors left to try, steps[i] the edge from stack[i + 1] to it
+    stack = [(target, predecessors(target, distance, movies_of, stars_of))]
+    steps = []
+    while stack:
+        person, remaining = stack[-1]
+        step = next(remaining, None)
+        if step is None:
+            stack.pop()
+            if steps:
+                steps.pop()
+            continue
+        movie, previous = step
+        steps.append((movie, person))
+        if previous == source:
+            yield steps[::-1]
+            steps.pop()
+        else:
+            stack.append((previous,
+                          predecessors(previous, distance, movies_of, stars_of)))
+
+
+def count_shortest_paths(source, target, movies_of, stars_of):
+    """
+    Number of distinct shortest paths from source to target (0 if they
+    aren't connected), without listing them.
+
+    Each person's count is the sum of the counts of their predecessors,
+    once per shared movie, filled in layer by layer. A movie joins only
+    the layer that first reaches it to the next one, so each cast is
+    scanned once: its members in the layer add up to the paths through
+    the movie, which every member in the next layer is credited with.
+    """
+    if source == target:
+        return 1
+    distance = {source: 0}
+    count = {source: 1}
+    seen_movies = set()
+    layer = [source]
+    d = 0
+    while layer and target not in distance:
+        d += 1
+        next_layer = []
+        for person in layer:
+            for movie in movies_of(person):
+                if movie in seen_movies:
+                    continue
+                seen_movies.add(movie)
+                paths = 0
+                reached = []
+                for star in stars_of(movie):
+                    known = distance.get(star)
+                    if known is None:
+                        distance[star] = d
+                        count[star] = 0
+                        next_layer.append(star)
+                        reached.append(star)
+                    elif known == d - 1:
+                        paths += count[star]
+                    elif known == d:
+                        reached.append(star)
+                for star in reached:
+                    count[star] += paths
+        layer = next_layer
+    return count.get(target, 0)
@@ -0,0 +1,140 @@
+"""
+Answers many degrees queries against one loaded graph.
+
+Reads one query per line, two people separated by a tab (each a name or an
+IMDB person ID), and writes one JSON object per line:
+
+    python batch.py [directory] [pairs file] [engine]
+
+With no pairs file, queries are read from standard input.
+"""
+import functools
+import json
+import sys
+from collections import OrderedDict
+
+import degrees
+
+# how many per-source BFS trees to keep around at once
+TREE_CACHE_SIZE = 16
+
+# how many recent sources to remember, so a repeated one gets a tree
+SEEN_SOURCES = 4096
+
+# how many names and IDs to remember the resolution of
+RESOLVE_CACHE_SIZE = 4096
+
+
+def read_pairs(lines):
+    """
+    Yields (source, target) pairs from tab-separated lines,
+    skipping blank lines.
+    """
+    for line in lines:
+        line = line.rstrip("\r\n")
+        if not line.strip():
+            continue
+        source, sep, target = line.partition("\t")
+        if not sep:
+            raise ValueError(f"expected two tab-separated people: {line!r}")
+        yield source.strip(), target.strip()
+
+
+def resolve(person):
+    """
+    Resolves a name or person ID without prompting.
+
+    Names that don't match exactly are retried ignoring case and accents
+    (see degrees.find_people). Returns (person_id, error), exactly one of
+    which is None; ambiguous names list their ranked candidates.
+    """
+    if degrees.is_person(person):
+        return person, None
+    person_id = degrees.person_id_for_name(person, interactive=False)
+    if person_id is not None:
+        return person_id, None
+    candidates = degrees.find_people(person, limit=None)
+    if len(candidates) == 1:
+        return candidates[0].person_id, None
+    if candidates:
+        return None, {"error": "ambiguous", "name": person,
+                      "candidates": [candidate._asdict() for candidate in candidates]}
+    return None, {"error": "not found", "name": person}
+
+
+def run_batch(pairs, engine="bfs"):
+    """
+    Answers every (source, target) pair, yielding one result dict per pair
+    in input order as soon as it is answered, so pairs can be streamed.
+
+    A source seen again among the last SEEN_SOURCES gets a full BFS tree
+    (see degrees.search_tree) that answers its queries from then on;
+    first sightings go through degrees.shortest_path with the given engine.
+    """
+    resolved = functools.lru_cache(maxsize=RESOLVE_CACHE_SIZE)(resolve)
+    seen = OrderedDict()
+    trees = OrderedDict()
+
+    for source, target in pairs:
+        result = {"source": source, "target": target}
+        (source_id, source_error), (target_id, target_error) = (
+            resolved(source), resolved(target)
+        )
+        if source_error or target_error:
+            result.update(source_error or target_error)
+            yield result
+            continue
+
+        if source_id in trees:
+            trees.move_to_end(source_id)
+            path = degrees.path_in_tree(trees[source_id], target_id)
+        elif source_id in seen:
+            trees[source_id] = degrees.search_tree(source_id)
+            if len(trees) > TREE_CACHE_SIZE:
+                trees.popitem(last=False)
+            path = degrees.path_in_tree(trees[source_id], target_id)
+        else:
+            seen[source_id] = None
+            if len(seen) > SEEN_SOURCES:
+                seen.popitem(last=False)
+            path = degrees.shortest_path(source_id, target_id, engine)
+
+        result.update(source_id=source_id, target_id=target_id)
+        if path is None:
+            result["degrees"] = None
+            result["path"] = None
+        else:
+            result["degrees"] = len(path)
+            result["path"] = [list(step) for step in path]
+        yield result
+
+
+def write_results(results, stream=sys.stdout):
+    """Writes results as JSON lines, flushing after each one."""
+    for result in results:
+        stream.write(json.dumps(result) + "\n")
+        stream.flush()
+
+
+def main():
+    if len(sys.argv) > 4:
+        sys.exit("Usage: python batch.py [directory] [pairs file] [engine]")
+    directory = sys.argv[1] if len(sys.argv) >= 2 else "large"
+    engine = sys.argv[3] if len(sys.argv) == 4 else "bfs"
+    if engine not in degrees.ENGINES:
+        sys.exit(f"Unknown engine. Choose from: {', '.join(degrees.ENGINES)}")
+
+    if engine == "csr":
+        degrees.load_data(directory, "snapshot")
+    else:
+        degrees.load_data(directory)
+
+    if len(sys.argv) >= 3 and sys.argv[2] != "-":
+        with open(sys.argv[2], encoding="utf-8") as f:
+            write_results(run_batch(read_pairs(f), engine))
+    else:
+        write_results(run_batch(read_pairs(sys.stdin), engine))
+
+
+if __name__ == "__main__":
+    main()
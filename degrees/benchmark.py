@@ -0,0 +1,224 @@
+"""
+Benchmarks for degrees loading and search on synthetic data.
+
+Generate a dataset with power-law cast and filmography sizes:
+
+    python benchmark.py generate [directory] [people] [movies] [seed]
+
+Then time every search engine on it:
+
+    python benchmark.py run [directory] [queries] [engine ...]
+
+Each engine is measured in a fresh process, loading the data with the
+backend it needs, and one JSON object per engine is printed with load time,
+peak RSS, neighbors_for_person throughput, queries/sec and latency
+percentiles, so runs can be diffed between versions.
+"""
+import csv
+import json
+import os
+import platform
+import random
+import resource
+import sys
+import time
+from bisect import bisect
+from concurrent.futures import ProcessPoolExecutor
+from itertools import accumulate
+
+import degrees
+
+# defaults for generate
+PEOPLE = 20000
+MOVIES = 10000
+SEED = 50
+
+# defaults for run
+QUERIES = 200
+
+# power-law exponents: a few movies have huge casts and a few people
+# are in a huge number of movies, most have small ones
+CAST_ALPHA = 2.2
+POPULARITY_ALPHA = 1.8
+MIN_CAST = 3
+MAX_CAST = 200
+
+# backend each engine needs its data loaded with
+ENGINE_BACKENDS = {"csr": "csr"}
+
+FIRST_NAMES = ["Alex", "Sam", "Jordan", "Taylor", "Morgan", "Casey", "Jamie",
+               "Robin", "Avery", "Riley", "Quinn", "Drew", "Rowan", "Sky"]
+LAST_NAMES = ["Smith", "Garcia", "Nguyen", "Müller", "Rossi", "Kowalski",
+              "Sato", "Okafor", "Silva", "Dubois", "Novak", "Haddad"]
+
+
+def power_law(rng, alpha, low, high):
+    """A value in [low, high] from a discrete Pareto distribution."""
+    return min(high, int(low * rng.paretovariate(alpha - 1)))
+
+
+def generate(directory, people=PEOPLE, movies=MOVIES, seed=SEED):
+    """
+    Writes people.csv, movies.csv and stars.csv of a synthetic dataset.
+
+    Cast sizes follow a power law, and stars are drawn with power-law
+    popularity weights, so filmography sizes do too. Names repeat, so
+    ambiguous lookups happen as they do on the real data.
+    """
+    rng = random.Random(seed)
+    os.makedirs(directory, exist_ok=True)
+
+    with open(f"{directory}/people.csv", "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f, quoting=csv.QUOTE_NONNUMERIC)
+        writer.writerow(["id", "name", "birth"])
+        for i in range(people):
+            name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)} {i % 997}"
+            birth = rng.randint(1900, 2010) if rng.random() < 0.9 else ""
+            writer.writerow([i + 1, name, birth])
+
+    with open(f"{directory}/movies.csv", "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f, quoting=csv.QUOTE_NONNUMERIC)
+        writer.writerow(["id", "title", "year"])
+        for i in range(movies):
+            writer.writerow([i + 1, f"Movie {i + 1}", rng.randint(1920, 2025)])
+
+    popularity = [rng.paretovariate(POPULARITY_ALPHA - 1) for _ in range(people)]
+    cumulative = list(accumulate(popularity))
+    total = cumulative[-1]
+    casts = []
+    for movie in range(movies):
+        cast = power_law(rng, CAST_ALPHA, MIN_CAST, min(MAX_CAST, people))
+        casts.append({
+            min(bisect(cumulative, rng.random() * total), people - 1)
+            for _ in range(cast)
+        })
+
+    # everyone gets at least one movie, like on the real data
+    cast_members = set().union(*casts)
+    for person in range(people):
+        if person not in cast_members:
+            casts[rng.randrange(movies)].add(person)
+
+    with open(f"{directory}/stars.csv", "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["person_id", "movie_id"])
+        for movie, cast in enumerate(casts):
+            for person in sorted(cast):
+                writer.writerow([person + 1, movie + 1])
+
+
+def query_mix(directory, count=QUERIES, seed=SEED):
+    """
+    A fixed list of (source, target) person ID pairs drawn from people.csv.
+    """
+    with open(f"{directory}/people.csv", encoding="utf-8") as f:
+        person_ids = [row["id"] for row in csv.DictReader(f)]
+    rng = random.Random(seed)
+    return [tuple(rng.sample(person_ids, 2)) for _ in range(count)]
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    rank = max(1, round(fraction * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def peak_rss():
+    """Peak resident set size of this process, in bytes."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def measure(directory, engine, pairs):
+    """
+    Loads the data and answers every pair with one engine. Meant to run
+    in a fresh process so load time and peak RSS belong to this engine.
+    """
+    backend = ENGINE_BACKENDS.get(engine, "dict")
+    started = time.perf_counter()
+    degrees.load_data(directory, backend)
+    load_seconds = time.perf_counter() - started
+
+    sources = sorted({source for source, _ in pairs})
+    started = time.perf_counter()
+    for person_id in sources:
+        degrees.neighbors_for_person(person_id)
+    neighbors_seconds = time.perf_counter() - started
+
+    latencies = []
+    found = 0
+    started = time.perf_counter()
+    for source, target in pairs:
+        query_started = time.perf_counter()
+        path = degrees.shortest_path(source, target, engine)
+        latencies.append(time.perf_counter() - query_started)
+        found += path is not None
+    query_seconds = time.perf_counter() - started
+    latencies.sort()
+
+    return {
+        "engine": engine,
+        "backend": backend,
+        "load_seconds": load_seconds,
+        "peak_rss_bytes": peak_rss(),
+        "neighbors_per_second": len(sources) / neighbors_seconds if neighbors_seconds else None,
+        "queries": len(pairs),
+        "found": found,
+        "queries_per_second": len(pairs) / query_seconds if query_seconds else None,
+        "latency_seconds": {
+            "p50": percentile(latencies, 0.50),
+            "p90": percentile(latencies, 0.90),
+            "p99": percentile(latencies, 0.99),
+            "max": latencies[-1] if latencies else None,
+        },
+    }
+
+
+def run(directory, queries=QUERIES, engines=None, seed=SEED):
+    """
+    Measures every engine on the same query mix, each in its own process.
+    Yields one result dict per engine.
+    """
+    pairs = query_mix(directory, queries, seed)
+    for engine in engines or list(degrees.ENGINES):
+        with ProcessPoolExecutor(1) as pool:
+            result = pool.submit(measure, directory, engine, pairs).result()
+        result.update(
+            directory=directory,
+            seed=seed,
+            python=platform.python_version(),
+            timestamp=time.time(),
+        )
+        yield result
+
+
+def main():
+    usage = ("Usage: python benchmark.py generate [directory] [people] [movies] [seed]\n"
+             "       python benchmark.py run [directory] [queries] [engine ...]")
+    if len(sys.argv) < 2 or sys.argv[1] not in ("generate", "run"):
+        sys.exit(usage)
+    directory = sys.argv[2] if len(sys.argv) >= 3 else "synthetic"
+
+    if sys.argv[1] == "generate":
+        if len(sys.argv) > 6:
+            sys.exit(usage)
+        people, movies, seed = (
+            [int(arg) for arg in sys.argv[3:]] + [PEOPLE, MOVIES, SEED][len(sys.argv[3:]):]
+        )
+        generate(directory, people, movies, seed)
+        print(f"Wrote {people} people and {movies} movies to {directory}.")
+    else:
+        queries = int(sys.argv[3]) if len(sys.argv) >= 4 else QUERIES
+        engines = sys.argv[4:] or None
+        for engine in engines or []:
+            if engine not in degrees.ENGINES:
+                sys.exit(f"Unknown engine. Choose from: {', '.join(degrees.ENGINES)}")
+        for result in run(directory, queries, engines):
+            print(json.dumps(result), flush=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""
+LRU cache of shortest_path results, tied to the dataset it was computed on.
+
+Every cache carries a fingerprint of the CSV directory it was filled from.
+A cache saved to disk is only loaded back if the fingerprint still matches,
+so a changed dataset never serves stale paths.
+"""
+import hashlib
+import json
+import os
+from collections import OrderedDict
+
+from snapshot import SOURCES
+
+# default number of (source, target) results kept in memory
+MAXSIZE = 100000
+
+# bytes read at a time when hashing file contents
+BLOCK_SIZE = 1 << 20
+
+
+def fingerprint(directory, content=False, sources=SOURCES):
+    """
+    Returns a hex digest identifying the CSVs in a dataset directory.
+
+    By default it hashes each file's name, size and modification time,
+    which is instant. With content=True it hashes the file bytes instead.
+    """
+    digest = hashlib.sha256()
+    for name in sources:
+        path = os.path.join(directory, name)
+        digest.update(name.encode())
+        if content:
+            with open(path, "rb") as f:
+                for block in iter(lambda: f.read(BLOCK_SIZE), b""):
+                    digest.update(block)
+        else:
+            stat = os.stat(path)
+            digest.update(f"{stat.st_size}:{stat.st_mtime_ns}".encode())
+    return digest.hexdigest()
+
+
+class PathCache():
+    """
+    Maps (source, target) to a shortest path (or None for not connected),
+    evicting the least recently used entry past `maxsize`.
+    """
+    def __init__(self, fingerprint, maxsize=MAXSIZE):
+        self.fingerprint = fingerprint
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, key):
+        return key in self.entries
+
+    def get(self, source, target):
+        """
+        Returns (True, path) on a hit and (False, None) on a miss.
+        """
+        key = (source, target)
+        if key not in self.entries:
+            self.misses += 1
+            return False, None
+        self.hits += 1
+        self.entries.move_to_end(key)
+        path = self.entries[key]
+        return True, None if path is None else list(path)
+
+    def put(self, source, target, path):
+        key = (source, target)
+        self.entries[key] = None if path is None else tuple(path)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+
+    def clear(self):
+        self.entries.clear()
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "size": len(self.entries),
+            "maxsize": self.maxsize,
+        }
+
+    def save(self, path):
+        """
+        Writes the cache to a JSON file, least recently used entry first.
+        """
+        entries = [
+            [source, target, None if result is None else [list(step) for step in result]]
+            for (source, target), result in self.entries.items()
+        ]
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"fingerprint": self.fingerprint, "entries": entries}, f)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path, fingerprint, maxsize=MAXSIZE):
+        """
+        Reads a cache written by save. Returns an empty cache if the file
+        is missing, unreadable, or was saved for another dataset.
+        """
+        cache = cls(fingerprint, maxsize)
+        try:
+            with open(path, encoding="utf-8") as f:
+                saved = json.load(f)
+        except (OSError, ValueError):
+            return cache
+        if saved.get("fingerprint") != fingerprint:
+            return cache
+        for source, target, result in saved["entries"]:
+            cache.put(source, target,
+                      None if result is None else [tuple(step) for step in result])
+        return cache
@@ -0,0 +1,76 @@
+"""
+Client for server.py, and a drop-in for the interactive degrees.main
+that asks a running server instead of loading the data itself:
+
+    python client.py [host:port]
+"""
+import json
+import sys
+from urllib.error import HTTPError
+from urllib.parse import urlencode
+from urllib.request import urlopen
+
+from server import HOST, PORT
+
+
+def query(endpoint, address=f"{HOST}:{PORT}", **params):
+    """
+    Sends one GET request to the server and returns the decoded JSON body,
+    for error responses too.
+    """
+    params = {key: value for key, value in params.items() if value is not None}
+    url = f"http://{address}/{endpoint}?{urlencode(params)}"
+    try:
+        with urlopen(url) as response:
+            return json.load(response)
+    except HTTPError as e:
+        return json.load(e)
+
+
+def shortest_path(source, target, address=f"{HOST}:{PORT}", timeout=None,
+                  max_degrees=None):
+    """Asks the server for the path between two names or person IDs."""
+    return query("path", address, source=source, target=target,
+                 timeout=timeout, max_degrees=max_degrees)
+
+
+def lookup(name, address=f"{HOST}:{PORT}", mode="exact", limit=None):
+    """Asks the server for ranked people matching a name."""
+    return query("lookup", address, name=name, mode=mode, limit=limit)
+
+
+def main():
+    if len(sys.argv) > 2:
+        sys.exit("Usage: python client.py [host:port]")
+    address = sys.argv[1] if len(sys.argv) == 2 else f"{HOST}:{PORT}"
+
+    source = input("Name: ")
+    target = input("Name: ")
+    result = shortest_path(source, target, address)
+
+    if "error" in result:
+        if result["error"] == "ambiguous":
+            print(f"Which '{result['name']}'?")
+            for candidate in result["candidates"]:
+                print(f"ID: {candidate['person_id']}, Name: {candidate['name']}, "
+                      f"Birth: {candidate['birth']}")
+            sys.exit("Query again with the intended person ID.")
+        if result["error"] == "not found":
+            sys.exit("Person not found.")
+        sys.exit(f"Error: {result['error']}")
+
+    if result["status"] == "budget exceeded":
+        print(f"No path found before the {result['exceeded']} budget ran out.")
+    elif result["path"] is None:
+        print("Not connected.")
+    else:
+        degrees = result["degrees"]
+        print(f"{degrees} degrees of separation.")
+        person1 = result["source_name"]
+        for i, step in enumerate(result["path"]):
+            print(f"{i + 1}: {person1} and {step['person']} starred in {step['movie']}")
+            person1 = step["person"]
+
+
+if __name__ == "__main__":
+    main()
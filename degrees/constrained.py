@@ -0,0 +1,136 @@
+"""
+Constrained and weighted path search.
+
+Constraints are checked while expanding, on the same adjacency the other
+searches use, so nothing is copied or filtered up front. Without a weight
+this is a plain breadth-first search; with one it is Dijkstra over
+(degrees, total weight) costs, which still finds the fewest degrees first
+and only uses the weight to choose between equally short paths.
+"""
+import heapq
+from collections import deque
+
+# named weights for constrained_search, each maps a movie year to a cost
+WEIGHTS = {
+    # prefer newer movies, a path through 2010 films beats one through 1990
+    "recency": lambda year: -year,
+}
+
+
+class Constraints():
+    """
+    Which edges a constrained search may use: only movies released between
+    min_year and max_year (inclusive, either may be None), and none of the
+    excluded people or movies.
+    """
+    def __init__(self, min_year=None, max_year=None,
+                 exclude_people=(), exclude_movies=()):
+        self.min_year = min_year
+        self.max_year = max_year
+        self.exclude_people = set(exclude_people)
+        self.exclude_movies = set(exclude_movies)
+
+    def allows_year(self, year):
+        if self.min_year is not None and (year is None or year < self.min_year):
+            return False
+        if self.max_year is not None and (year is None or year > self.max_year):
+            return False
+        return True
+
+
+def constrained_search(source, target, movies_of, stars_of, year_of,
+                       constraints, weight=None):
+    """
+    Shortest path from source to target using only edges the constraints
+    allow. People and movies are whatever keys the callbacks take:
+    movies_of(person) and stars_of(movie) give adjacency, year_of(movie)
+    gives a release year or None.
+
+    `weight` is None, a name in WEIGHTS, or a function of a movie's year.
+    Returns a list of (movie, person) pairs, or None.
+    """
+    excluded = constraints.exclude_people
+    if source in excluded or target in excluded:
+        return None
+    if isinstance(weight, str):
+        weight = WEIGHTS[weight]
+
+    def usable(movie):
+        return (movie not in constraints.exclude_movies
+                and constraints.allows_year(year_of(movie)))
+
+    if weight is None:
+        return breadth_first(source, target, movies_of, stars_of, usable, excluded)
+    return lowest_cost(source, target, movies_of, stars_of, year_of, usable,
+                       excluded, weight)
+
+
+def breadth_first(source, target, movies_of, stars_of, usable, excluded):
+    parents = {source: None}
+    seen_movies = set()
+    queue = deque([source])
+    while queue:
+        person = queue.popleft()
+        for movie in movies_of(person):
+            if movie in seen_movies:
+                continue
+            seen_movies.add(movie)
+            if not usable(movie):
+                continue
+            for star in stars_of(movie):
+                if star in parents or star in excluded:
+                    continue
+                parents[star] = (person, movie)
+                if star == target:
+                    return walk_back(parents, target)
+                queue.append(star)
+    return None
+
+
+def lowest_cost(source, target, movies_of, stars_of, year_of, usable,
+                excluded, weight):
+    # costs are (degrees, total weight) so fewer degrees always wins;
+    # every edge adds a degree, so costs only grow and Dijkstra holds
+    # even for negative weights
+    best = {source: (0, 0)}
+    parents = {source: None}
+    done = set()
+    seen_movies = set()
+    counter = 0
+    heap = [(0, 0, counter, source)]
+    while heap:
+        hops, total, _, person = heapq.heappop(heap)
+        if person in done:
+            continue
+        done.add(person)
+        if person == target:
+            return walk_back(parents, target)
+        for movie in movies_of(person):
+            # people are popped in cost order, so whoever scans a movie
+            # first already gives its cast the cheapest cost through it
+            if movie in seen_movies:
+                continue
+            seen_movies.add(movie)
+            if not usable(movie):
+                continue
+            year = year_of(movie)
+            cost = (hops + 1, total + weight(0 if year is None else year))
+            for star in stars_of(movie):
+                if star in done or star in excluded:
+                    continue
+                if star not in best or cost < best[star]:
+                    best[star] = cost
+                    parents[star] = (person, movie)
+                    counter += 1
+                    heapq.heappush(heap, (*cost, counter, star))
+    return None
+
+
+def walk_back(parents, target):
+    path = []
+    while parents[target] is not None:
+        person, movie = parents[target]
+        path.append((movie, target))
+        target = person
+    path.reverse()
+    return path
@@ -1,7 +1,19 @@
 import csv
+import os
 import sys
 
-from util import Node, StackFrontier, QueueFrontier
+from allpaths import all_shortest_paths as enumerate_shortest_paths
+from allpaths import count_shortest_paths as count_paths
+from cache import MAXSIZE, PathCache, fingerprint
+from constrained import Constraints, constrained_search
+from graph import (NO_YEAR, Components, Graph, SingleSource, format_year,
+                   label_components, parse_year)
+from ingest import ProgressReporter
+from landmarks import LANDMARKS, LandmarkIndex
+from name_index import LIMIT, NameSearch
+from snapshot import load_snapshot, name_index
+from util import Node, DequeQueueFrontier, ExploredSet
+from util import BUDGET_EXCEEDED, FOUND, NOT_CONNECTED, Budget, SearchResult
 
 # Maps names to a set of corresponding person_ids
 names = {}
@@ -12,11 +24,82 @@ people = {}
 # Maps movie_ids to a dictionary of: title, year, stars (a set of person_ids)
 movies = {}
 
+# Compact integer-indexed graph, used instead of people/movies
+# when data is loaded with backend="csr" or backend="snapshot"
+graph = None
 
-def load_data(directory):
+# Directory the current data was loaded from
+loaded_directory = None
+
+# Fingerprint of the loaded data: the CSVs' (see cache.fingerprint),
+# combined with each batch of changes applied since (see delta)
+data_fingerprint = None
+
+# Optional PathCache of shortest_path results, see enable_cache
+path_cache = None
+
+# NameSearch over the loaded people, built on first use by find_people
+name_search = None
+
+# graph.Components of the loaded data, labelled by load_data
+components = None
+
+# Optional landmarks.LandmarkIndex, see build_landmarks
+landmark_index = None
+
+# Graph built from people/movies for the dict backend, see graph_view
+dict_graph = None
+
+
+def load_data(directory, backend="dict", progress=None, processes=None):
     """
     Load data from CSV files into memory.
+
+    With backend="dict" this fills the people and movies dicts,
+    with backend="csr" it builds the compact `graph` instead, and `names`
+    becomes a sorted name index (see snapshot.name_index).
+    With backend="snapshot" the graph is memory-mapped from a binary
+    snapshot in the directory, recompiled first if the CSVs are newer,
+    and `names` is replaced by the snapshot's name index.
+
+    The graph backends stream the CSVs in chunks and call `progress`
+    (see ingest.stream_columns) as they go, or with `processes` > 1
+    parse them in parallel (see Graph.from_csv_parallel).
+
+    Every backend also labels connected components (or reads them from
+    the snapshot), so shortest_path answers disconnected pairs in O(1).
+
+    Loading data replaces whatever was loaded before, whichever backend
+    it came from, and drops any path cache, re-enable it with enable_cache.
     """
+    global graph, names, loaded_directory, path_cache, name_search, components
+    global landmark_index, dict_graph, data_fingerprint
+    if backend not in ("dict", "csr", "snapshot"):
+        raise ValueError(f"unknown backend: {backend}")
+    loaded_directory = directory
+    data_fingerprint = fingerprint(directory)
+    path_cache = None
+    name_search = None
+    landmark_index = None
+    dict_graph = None
+
+    # start from nothing, so no backend sees another one's leftovers
+    names = {}
+    people.clear()
+    movies.clear()
+
+    if backend == "snapshot":
+        graph = load_snapshot(directory, progress=progress, processes=processes)
+        names = graph.names
+        components = graph.components()
+        return
+    if backend == "csr":
+        graph = Graph.from_csv(directory, progress=progress, processes=processes)
+        names = name_index(graph.person_names, graph.person_ids)
+        components = graph.components()
+        return
+    graph = None
+
     # Load people
     with open(f"{directory}/people.csv", encoding="utf-8") as f:
         reader = csv.DictReader(f)
@@ -51,15 +134,35 @@ def load_data(directory):
             except KeyError:
                 pass
 
+    components = dict_components()
+
+
+def dict_components():
+    """
+    Labels the connected components of the people and movies dicts.
+    """
+    index = {person_id: i for i, person_id in enumerate(people)}
+    labels = label_components(
+        len(index),
+        ([index[star] for star in movie["stars"]] for movie in movies.values())
+    )
+    return Components(labels, index)
+
 
 def main():
-    if len(sys.argv) > 2:
-        sys.exit("Usage: python degrees.py [directory]")
-    directory = sys.argv[1] if len(sys.argv) == 2 else "large"
+    if len(sys.argv) > 3:
+        sys.exit("Usage: python degrees.py [directory] [engine]")
+    directory = sys.argv[1] if len(sys.argv) >= 2 else "large"
+    engine = sys.argv[2] if len(sys.argv) == 3 else "bfs"
+    if engine not in ENGINES:
+        sys.exit(f"Unknown engine. Choose from: {', '.join(ENGINES)}")
 
     # Load data from files into memory
     print("Loading data...")
-    load_data(directory)
+    if engine == "csr":
+        load_data(directory, "snapshot", progress=ProgressReporter())
+    else:
+        load_data(directory)
     print("Data loaded.")
 
     source = person_id_for_name(input("Name: "))
@@ -69,7 +172,7 @@ def main():
     if target is None:
         sys.exit("Person not found.")
 
-    path = shortest_path(source, target)
+    path = shortest_path(source, target, engine)
 
     if path is None:
         print("Not connected.")
@@ -78,19 +181,268 @@ def main():
         print(f"{degrees} degrees of separation.")
         path = [(None, source)] + path
         for i in range(degrees):
-            person1 = people[path[i][1]]["name"]
-            person2 = people[path[i + 1][1]]["name"]
-            movie = movies[path[i + 1][0]]["title"]
+            person1 = person_name(path[i][1])
+            person2 = person_name(path[i + 1][1])
+            movie = movie_title(path[i + 1][0])
             print(f"{i + 1}: {person1} and {person2} starred in {movie}")
 
 
-def shortest_path(source, target):
+def shortest_path(source, target, engine=None, max_degrees=None,
+                  max_expansions=None, timeout=None):
     """
     Returns the shortest list of (movie_id, person_id) pairs
     that connect the source to the target.
 
-    If no possible path, returns None.
+    `engine` picks the search strategy, one of the keys of ENGINES
+    (default "bfs", or "bipartite" when a budget is given).
+
+    If no possible path, returns None. Passing any of max_degrees,
+    max_expansions or timeout (seconds) bounds the search, see search();
+    None is then also returned when a budget runs out. Only the engines
+    in BUDGETED_ENGINES can enforce a budget, others raise ValueError.
+
+    Cached paths are returned without searching, budget or not, and
+    only searches that ran to completion are cached.
+    """
+    budgeted = (max_degrees, max_expansions, timeout) != (None, None, None)
+    if engine is None:
+        engine = "bipartite" if budgeted else "bfs"
+    if engine not in ENGINES:
+        raise ValueError(f"unknown search engine: {engine}")
+    if budgeted and engine not in BUDGETED_ENGINES:
+        raise ValueError(f"the {engine} engine can't enforce a search budget, "
+                         f"use one of: {', '.join(BUDGETED_ENGINES)}")
+    if not connected(source, target):
+        return None
+
+    if path_cache is not None:
+        hit, path = path_cache.get(source, target)
+        if hit:
+            # the shortest path is known, so a longer one can't fit either
+            if path is not None and max_degrees is not None and len(path) > max_degrees:
+                return None
+            return path
+
+    if budgeted:
+        budget = Budget(max_degrees, max_expansions, timeout)
+        result = BUDGETED_ENGINES[engine](source, target, budget)
+        if path_cache is not None and result.status != BUDGET_EXCEEDED:
+            path_cache.put(source, target, result.path)
+        return result.path
+
+    path = ENGINES[engine](source, target)
+    if path_cache is not None:
+        path_cache.put(source, target, path)
+    return path
+
+
+def search(source, target, max_degrees=None, max_expansions=None, timeout=None):
+    """
+    Shortest path search with hard limits on its cost: at most max_degrees
+    hops, max_expansions people expanded and timeout seconds of wall clock.
+
+    Returns a util.SearchResult with status FOUND (and the path),
+    NOT_CONNECTED, or BUDGET_EXCEEDED (and which budget ran out),
+    plus the number of people expanded either way.
+    """
+    if not connected(source, target):
+        return SearchResult(NOT_CONNECTED)
+    budget = Budget(max_degrees, max_expansions, timeout)
+    return bipartite_search(source, target, budget)
+
+
+def constrained_path(source, target, min_year=None, max_year=None,
+                     exclude_people=(), exclude_movies=(), weight=None):
+    """
+    Shortest path using only movies released from min_year to max_year
+    and none of the excluded person or movie IDs.
+
+    With `weight` ("recency", or a function of a movie's year) equally
+    short paths are ranked by their total weight and the lowest returned.
+    Constraints are applied while expanding, see constrained.py.
+    Returns the usual (movie_id, person_id) list, or None.
+    """
+    if graph is not None:
+        movie_index, person_index = graph.movie_index, graph.person_index
+        # unknown IDs exclude nothing, as on the dict backend
+        constraints = Constraints(
+            min_year, max_year,
+            [person_index[person_id] for person_id in exclude_people
+             if person_id in person_index],
+            [movie_index[movie_id] for movie_id in exclude_movies
+             if movie_id in movie_index],
+        )
+        path = constrained_search(
+            person_index[source], person_index[target],
+            graph.movies_of, graph.stars_of, graph_movie_year,
+            constraints, weight
+        )
+        if path is None:
+            return None
+        return [(graph.movie_ids[m], graph.person_ids[p]) for m, p in path]
+
+    constraints = Constraints(min_year, max_year, exclude_people, exclude_movies)
+    return constrained_search(
+        source, target,
+        lambda person_id: people[person_id]["movies"],
+        lambda movie_id: movies[movie_id]["stars"],
+        dict_movie_year,
+        constraints, weight
+    )
+
+
+def all_shortest_paths(source, target):
+    """
+    Lazily yields every shortest (movie_id, person_id) path from source to
+    target, see allpaths.py. Yields nothing if they aren't connected.
+    """
+    if not connected(source, target):
+        return
+    if graph is not None:
+        movie_ids, person_ids = graph.movie_ids, graph.person_ids
+        for path in enumerate_shortest_paths(
+            graph.person_index[source], graph.person_index[target],
+            graph.movies_of, graph.stars_of
+        ):
+            yield [(movie_ids[m], person_ids[p]) for m, p in path]
+        return
+    yield from enumerate_shortest_paths(
+        source, target,
+        lambda person_id: people[person_id]["movies"],
+        lambda movie_id: movies[movie_id]["stars"],
+    )
+
+
+def count_shortest_paths(source, target):
+    """
+    Number of shortest paths from source to target, counted without
+    listing them (0 if they aren't connected).
+    """
+    if not connected(source, target):
+        return 0
+    if graph is not None:
+        return count_paths(graph.person_index[source], graph.person_index[target],
+                           graph.movies_of, graph.stars_of)
+    return count_paths(
+        source, target,
+        lambda person_id: people[person_id]["movies"],
+        lambda movie_id: movies[movie_id]["stars"],
+    )
+
+
+def build_landmarks(k=LANDMARKS, path=None):
+    """
+    Precomputes a landmark distance oracle with k landmarks for the loaded
+    data. If `path` is given, the oracle saved there is loaded instead,
+    unless it was built for other data (see data_fingerprint), in which
+    case it is rebuilt and saved over it.
+
+    The dict backend gets a compact graph.Graph built for the oracle.
+    """
+    global landmark_index
+    oracle_graph = graph_view()
+    if path is not None and os.path.exists(path):
+        try:
+            landmark_index = LandmarkIndex.load(oracle_graph, path, data_fingerprint)
+            return landmark_index
+        except ValueError:
+            pass
+    landmark_index = LandmarkIndex.build(oracle_graph, k)
+    if path is not None:
+        landmark_index.save(path, data_fingerprint)
+    return landmark_index
+
+
+def approximate_degrees(source, target, exact=False):
+    """
+    (lower, upper) bounds on the degrees between two people from the
+    landmark index, in a few array lookups. With exact=True falls back to
+    shortest_path and returns (degrees, degrees). None if not connected.
+
+    Landmarks are the best-connected people, so they tend to all sit in
+    the giant component. A connected pair no landmark reaches gets
+    (1, component size - 1), since a shortest path can't revisit anyone.
+    """
+    if not connected(source, target):
+        return None
+    if exact:
+        path = shortest_path(source, target, "bidirectional")
+        return None if path is None else (len(path), len(path))
+    if landmark_index is None:
+        raise RuntimeError("build_landmarks before asking for approximate degrees")
+    bounds = landmark_index.bounds(source, target)
+    if bounds is None:
+        if components is None:
+            # nothing says whether they're connected, so search
+            return approximate_degrees(source, target, exact=True)
+        return 1, components.size_of(source) - 1
+    return bounds
+
+
+def graph_movie_year(m):
+    year = graph.movie_years[m]
+    return None if year == NO_YEAR else year
+
+
+def dict_movie_year(movie_id):
+    year = parse_year(movies[movie_id]["year"])
+    return None if year == NO_YEAR else year
+
+
+def connected(source, target):
+    """
+    True if some path joins the two people, answered in O(1) from the
+    component labels. Always True if no components have been labelled.
+    """
+    if components is None:
+        return True
+    return components.connected(source, target)
+
+
+def component_stats():
+    """
+    Component size summary of the loaded data, see graph.Components.stats.
+    """
+    if components is None:
+        raise RuntimeError("load data before asking for component stats")
+    return components.stats()
+
+
+def enable_cache(maxsize=MAXSIZE, path=None):
+    """
+    Caches shortest_path results for the loaded dataset, keeping the
+    `maxsize` most recently used (source, target) pairs.
+
+    If `path` is given, entries previously saved there with save_cache are
+    loaded back, unless they were saved for other data: different CSVs,
+    or different changes applied on top of them. Returns the cache,
+    whose stats() reports hits and misses.
+    """
+    global path_cache
+    if loaded_directory is None:
+        raise RuntimeError("load data before enabling the cache")
+    if path is None:
+        path_cache = PathCache(data_fingerprint, maxsize)
+    else:
+        path_cache = PathCache.load(path, data_fingerprint, maxsize)
+    return path_cache
+
+
+def save_cache(path):
+    """
+    Writes the path cache to disk so a later run can enable_cache from it.
+    """
+    if path_cache is None:
+        raise RuntimeError("path cache is not enabled")
+    path_cache.save(path)
+
+
+def bfs_path(source, target):
+    """
+    Single-ended breadth-first search from source to target.
     """
+    if source == target:
+        return []
 
     # builds the frontier and adds explored nodes to a list
     explored_list = explore(source, target)
@@ -109,47 +461,42 @@ def shortest_path(source, target):
 def explore(start, target):
     # print("Exploring...")
 
-    f = QueueFrontier()
+    f = DequeQueueFrontier()
 
     f.add(Node(start, None, None))
 
-    explored_nodes = []
+    explored = ExploredSet()
 
     # this loop gets the next node in the frontier, adds all unexplored neighbors to the frontier,
     # and then removes the current node from the frontier
-    while True:
-        try:
-            # pop off the node you're going to explore
-            current_node = f.remove()
-
-            """
-            # check if the node you're currently exploring is the target, if so, add to list and break
-            if current_node.state == target:
-                explored_nodes.append(current_node)
-                break
-            """
-            # get neighbors for that node and iterate through them
-            for x in neighbors_for_person(current_node.state):
-                # add here a test to see if neighbor is target, to optimize search
-                if x[1] == target:
-                    explored_nodes.append(Node(x[1], current_node, x[0]))
-                    # print(f"Explored {len(explored_nodes)} nodes.")
-                    return explored_nodes
-                # if the node is not in the frontier and is not in the explored list, add it to the frontier
-                # IMPORTANT each node needs to have a state (person), parent (previous node), action (movie)
-                if not f.contains_state(x[1]) and not (any(x[1] == node.state for node in explored_nodes)):
-                    f.add(Node(x[1], current_node, x[0]))
-            
-            # when done with adding neighbors, add node to explored list
-            explored_nodes.append(current_node)
+    while not f.empty():
+        # pop off the node you're going to explore
+        current_node = f.remove()
+
+        """
+        # check if the node you're currently exploring is the target, if so, add to list and break
+        if current_node.state == target:
+            explored.add(current_node)
+            break
+        """
+        # get neighbors for that node and iterate through them
+        for x in neighbors_for_person(current_node.state):
+            # add here a test to see if neighbor is target, to optimize search
+            if x[1] == target:
+                explored.add(Node(x[1], current_node, x[0]))
+                # print(f"Explored {len(explored)} nodes.")
+                return explored.nodes
+            # if the node is not in the frontier and is not in the explored list, add it to the frontier
+            # IMPORTANT each node needs to have a state (person), parent (previous node), action (movie)
+            if not f.contains_state(x[1]) and not explored.contains_state(x[1]):
+                f.add(Node(x[1], current_node, x[0]))
         
-        # this should run only when it has went through all possible layers of neighbors but didn't find target
-        except:
-            # print(f"Explored {len(explored_nodes)} nodes.")
-            return None
-    
-    # print(f"Explored {len(explored_nodes)} nodes.")
-    return explored_nodes
+        # when done with adding neighbors, add node to explored list
+        explored.add(current_node)
+
+    # this runs only when it has went through all possible layers of neighbors but didn't find target
+    # print(f"Explored {len(explored)} nodes.")
+    return None
 
 # go through the nodes in reverse to find the path solution
 def reconstruct_path(node_list):
@@ -174,20 +521,296 @@ def reconstruct_path(node_list):
     return reconstructed_path
 
 
-def person_id_for_name(name):
+def bidirectional_path(source, target):
+    """
+    Breadth-first search that grows one frontier from the source and one
+    from the target, one full layer at a time, and stops as soon as they meet.
+
+    Returns the same (movie_id, person_id) list as bfs_path, or None.
+    """
+    if source == target:
+        return []
+
+    # each side maps a person to the (person, movie) it was reached from
+    forward = {source: None}
+    backward = {target: None}
+    forward_layer = [source]
+    backward_layer = [target]
+
+    while forward_layer and backward_layer:
+        # always grow the smaller layer, that keeps the two searches balanced
+        if len(forward_layer) <= len(backward_layer):
+            forward_layer, meeting = expand_layer(forward_layer, forward, backward)
+        else:
+            backward_layer, meeting = expand_layer(backward_layer, backward, forward)
+
+        if meeting is not None:
+            return join_paths(meeting, forward, backward)
+
+    return None
+
+
+def expand_layer(layer, visited, other_visited):
+    """
+    Expands every person in layer by one hop, recording parents in visited.
+
+    Returns the next layer and the first person also seen by the other
+    search (or None if the two searches haven't met yet).
+    """
+    next_layer = []
+    for person_id in layer:
+        for movie_id, neighbor in neighbors_for_person(person_id):
+            if neighbor in visited:
+                continue
+            visited[neighbor] = (person_id, movie_id)
+            if neighbor in other_visited:
+                return next_layer, neighbor
+            next_layer.append(neighbor)
+    return next_layer, None
+
+
+def join_paths(meeting, forward, backward):
+    """
+    Stitches the source half and the target half of a bidirectional search
+    together at the meeting person.
+    """
+    path = []
+
+    # walk back from the meeting person to the source
+    person_id = meeting
+    while forward[person_id] is not None:
+        parent, movie_id = forward[person_id]
+        path.append((movie_id, person_id))
+        person_id = parent
+    path.reverse()
+
+    # then walk forward from the meeting person to the target
+    person_id = meeting
+    while backward[person_id] is not None:
+        child, movie_id = backward[person_id]
+        path.append((movie_id, child))
+        person_id = child
+
+    return path
+
+
+def bipartite_path(source, target, max_degrees=None):
+    """
+    Breadth-first search over the person <-> movie graph.
+
+    Each movie is marked visited the first time any of its stars is
+    expanded, so its cast list is scanned at most once per query and no
+    (movie_id, person_id) neighbor sets are built. Returns the same path
+    format as bfs_path.
+
+    If max_degrees is given, gives up (returns None) once every path
+    of up to that many degrees has been tried.
+    """
+    return bipartite_search(source, target, Budget(max_degrees=max_degrees)).path
+
+
+def bipartite_search(source, target, budget):
+    """
+    bipartite_path within a util.Budget, returning a util.SearchResult.
+    """
+    if source == target:
+        return SearchResult(FOUND, [], 0)
+    if graph is not None:
+        return graph.bounded_search(source, target, budget)
+
+    # maps a person to the (person, movie) they were reached through
+    parents = {source: None}
+    seen_movies = set()
+    layer = [source]
+    degrees = 0
+    while layer:
+        degrees += 1
+        if not budget.allows_depth(degrees):
+            return SearchResult(BUDGET_EXCEEDED, None, budget.expanded,
+                                budget.exceeded)
+        next_layer = []
+        for person_id in layer:
+            if not budget.expand():
+                return SearchResult(BUDGET_EXCEEDED, None, budget.expanded,
+                                    budget.exceeded)
+            for movie_id in people[person_id]["movies"]:
+                if movie_id in seen_movies:
+                    continue
+                seen_movies.add(movie_id)
+                for star in movies[movie_id]["stars"]:
+                    if star in parents:
+                        continue
+                    parents[star] = (person_id, movie_id)
+                    if star == target:
+                        path = path_in_tree(parents, target)
+                        return SearchResult(FOUND, path, budget.expanded)
+                    next_layer.append(star)
+        layer = next_layer
+    return SearchResult(NOT_CONNECTED, None, budget.expanded)
+
+
+def csr_path(source, target, max_degrees=None):
+    """
+    Breadth-first search directly on the integer arrays of `graph`.
+    """
+    if graph is None:
+        raise RuntimeError("csr engine needs data loaded with backend=\"csr\"")
+    return graph.shortest_path(source, target, max_degrees)
+
+
+def csr_search(source, target, budget):
+    """
+    csr_path within a util.Budget, returning a util.SearchResult.
+    """
+    if graph is None:
+        raise RuntimeError("csr engine needs data loaded with backend=\"csr\"")
+    return graph.bounded_search(source, target, budget)
+
+
+# search strategies shortest_path can dispatch to, by name
+ENGINES = {
+    "bfs": bfs_path,
+    "bidirectional": bidirectional_path,
+    "csr": csr_path,
+    "bipartite": bipartite_path,
+}
+
+# engines that can search within a util.Budget, by name
+BUDGETED_ENGINES = {
+    "bipartite": bipartite_search,
+    "csr": csr_search,
+}
+
+
+def search_tree(source):
+    """
+    Breadth-first search from source over everything reachable from it.
+
+    Returns a dict mapping every reached person_id to the
+    (person_id, movie_id) it was first reached from (None for the source),
+    from which path_in_tree rebuilds a shortest path to any of them.
+    When a graph backend is loaded, returns single_source(source) instead.
+    """
+    if graph is not None:
+        return single_source(source)
+    tree = {source: None}
+    layer = [source]
+    while layer:
+        layer, _ = expand_layer(layer, tree, ())
+    return tree
+
+
+def path_in_tree(tree, target):
+    """
+    Returns the (movie_id, person_id) path from the root of a search_tree
+    to target, or None if target wasn't reached.
+    """
+    if isinstance(tree, SingleSource):
+        return tree.path(target)
+    if target not in tree:
+        return None
+    path = []
+    while tree[target] is not None:
+        parent, movie_id = tree[target]
+        path.append((movie_id, target))
+        target = parent
+    path.reverse()
+    return path
+
+
+def single_source(source):
+    """
+    Runs one full BFS from source.
+
+    Returns a graph.SingleSource with distance and predecessor arrays for
+    every person, a distance histogram, and path() to rebuild the path to
+    any target in O(path length). The dict backend searches a graph built
+    from the dicts, see graph_view.
+    """
+    view = graph_view()
+    return view.single_source(view.person_index[source])
+
+
+def graph_view():
+    """
+    The loaded data as a graph.Graph: the graph backend's own, or for the
+    dict backend one built from the dicts on first use and kept until the
+    data is reloaded or changed.
+    """
+    global dict_graph
+    if graph is not None:
+        return graph
+    if dict_graph is None:
+        dict_graph = Graph.from_dicts(people, movies)
+    return dict_graph
+
+
+def person_ids_for_name(name):
+    """
+    Returns every IMDB id matching a person's name.
+    """
+    return list(names.get(name.lower(), set()))
+
+
+def find_people(name, mode="exact", max_distance=2, limit=LIMIT):
+    """
+    Looks a name up without prompting, ignoring case and accents.
+
+    `mode` is "exact", "prefix" or "fuzzy" (within `max_distance` edits).
+    Returns up to `limit` name_index.Candidate tuples of person_id, name,
+    birth, movie_count and edit distance, best match first, so callers can
+    disambiguate in code.
+    """
+    global name_search
+    if name_search is None:
+        name_search = build_name_search()
+    return name_search.search(name, mode, max_distance, limit)
+
+
+def build_name_search():
+    """
+    Builds a NameSearch over every person in whichever backend is loaded.
+    """
+    if graph is not None:
+        rows = graph.people()
+        person_ids, person_names = graph.person_ids, graph.person_names
+        if graph.removed_people:
+            # leave removed people out rather than carry their tombstones
+            person_ids = [person_ids[p] for p in rows]
+            person_names = [person_names[p] for p in rows]
+        return NameSearch(
+            person_ids,
+            person_names,
+            [format_year(graph.person_births[p]) for p in rows],
+            [graph.degree(p) for p in rows],
+        )
+    person_ids = list(people)
+    return NameSearch(
+        person_ids,
+        [people[person_id]["name"] for person_id in person_ids],
+        [people[person_id]["birth"] for person_id in person_ids],
+        [len(people[person_id]["movies"]) for person_id in person_ids],
+    )
+
+
+def person_id_for_name(name, interactive=True):
     """
     Returns the IMDB id for a person's name,
     resolving ambiguities as needed.
+
+    With interactive=False ambiguous names return None
+    instead of prompting.
     """
-    person_ids = list(names.get(name.lower(), set()))
+    person_ids = person_ids_for_name(name)
     if len(person_ids) == 0:
         return None
     elif len(person_ids) > 1:
+        if not interactive:
+            return None
         print(f"Which '{name}'?")
         for person_id in person_ids:
-            person = people[person_id]
-            name = person["name"]
-            birth = person["birth"]
+            name = person_name(person_id)
+            birth = person_birth(person_id)
             print(f"ID: {person_id}, Name: {name}, Birth: {birth}")
         try:
             person_id = input("Intended Person ID: ")
@@ -200,11 +823,41 @@ def person_id_for_name(name):
         return person_ids[0]
 
 
+def is_person(person_id):
+    """True if person_id is a person in whichever backend is loaded."""
+    if graph is not None:
+        return person_id in graph.person_index
+    return person_id in people
+
+
+def person_name(person_id):
+    """Returns a person's name from whichever backend is loaded."""
+    if graph is not None:
+        return graph.person_names[graph.person_index[person_id]]
+    return people[person_id]["name"]
+
+
+def person_birth(person_id):
+    """Returns a person's birth year string from whichever backend is loaded."""
+    if graph is not None:
+        return format_year(graph.person_births[graph.person_index[person_id]])
+    return people[person_id]["birth"]
+
+
+def movie_title(movie_id):
+    """Returns a movie's title from whichever backend is loaded."""
+    if graph is not None:
+        return graph.movie_titles[graph.movie_index[movie_id]]
+    return movies[movie_id]["title"]
+
+
 def neighbors_for_person(person_id):
     """
     Returns (movie_id, person_id) pairs for people
     who starred with a given person.
     """
+    if graph is not None:
+        return graph.neighbors_for_person(person_id)
     movie_ids = people[person_id]["movies"]
     neighbors = set()
     for movie_id in movie_ids:
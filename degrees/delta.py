@@ -0,0 +1,281 @@
+"""
+Incremental updates to the loaded degrees data.
+
+Adds and removes people, movies and star edges in place, and keeps the
+derived indexes in step: `names` is updated, components are merged for
+additions and relabelled after removals, and the name search and path
+cache are invalidated. A delta directory holds any of:
+
+    people.csv, movies.csv, stars.csv
+        rows to add, same columns as the full dataset
+
+    removed_people.csv (id), removed_movies.csv (id),
+    removed_stars.csv (person_id, movie_id)
+        rows to remove
+
+Apply one with load_delta(directory).
+
+Graph backends take changes in place as well, as patches over their
+arrays (see graph.Graph); compact() folds them in when they pile up.
+"""
+import csv
+import hashlib
+import os
+
+import degrees
+from snapshot import name_index
+
+
+def apply_changes(add_people=(), add_movies=(), add_stars=(),
+                  remove_people=(), remove_movies=(), remove_stars=()):
+    """
+    Applies a batch of changes to the loaded data.
+
+    add_people are (id, name, birth), add_movies are (id, title, year),
+    add_stars and remove_stars are (person_id, movie_id), and
+    remove_people / remove_movies are IDs (removing their stars too).
+    Removals apply before additions.
+
+    Every backend is updated in place, in time proportional to the
+    change rather than to the loaded data, except that removals relabel
+    the connected components from scratch.
+    """
+    if degrees.loaded_directory is None:
+        raise RuntimeError("load data before applying changes")
+    add_people, add_movies = list(add_people), list(add_movies)
+    add_stars, remove_stars = list(add_stars), list(remove_stars)
+    remove_people, remove_movies = list(remove_people), list(remove_movies)
+
+    if degrees.graph is not None:
+        apply_to_graph(add_people, add_movies, add_stars,
+                       remove_people, remove_movies, remove_stars)
+    else:
+        apply_to_dicts(add_people, add_movies, add_stars,
+                       remove_people, remove_movies, remove_stars)
+
+    # the same changes on the same data give the same fingerprint, so a
+    # cache saved after them loads back once they are applied again
+    changes = (add_people, add_movies, add_stars,
+               remove_people, remove_movies, remove_stars)
+    degrees.data_fingerprint = hashlib.sha256(
+        f"{degrees.data_fingerprint}+{changes!r}".encode()
+    ).hexdigest()
+
+    # any change can make a cached path wrong
+    degrees.name_search = None
+    degrees.landmark_index = None
+    degrees.dict_graph = None
+    if degrees.path_cache is not None:
+        degrees.path_cache.clear()
+        degrees.path_cache.fingerprint = degrees.data_fingerprint
+
+
+def apply_to_graph(add_people, add_movies, add_stars,
+                   remove_people, remove_movies, remove_stars):
+    graph = degrees.graph
+    if not isinstance(degrees.names, PatchedNames):
+        degrees.names = PatchedNames(degrees.names)
+    names = degrees.names
+    relabel = bool(remove_people or remove_movies or remove_stars)
+
+    for person_id, movie_id in remove_stars:
+        graph.remove_star(person_id, movie_id)
+    for person_id in remove_people:
+        graph.remove_person(person_id)
+        names.remove(person_id)
+    for movie_id in remove_movies:
+        graph.remove_movie(movie_id)
+
+    # re-adding an existing ID replaces it
+    if any(row[0] in graph.person_index for row in add_people):
+        relabel = True
+    if any(row[0] in graph.movie_index for row in add_movies):
+        relabel = True
+
+    components = degrees.components
+    for person_id, name, birth in add_people:
+        names.remove(person_id)
+        graph.add_person(person_id, name, birth)
+        names.add(person_id, name)
+        if components is not None and not relabel:
+            components.add_person(person_id)
+    for movie_id, title, year in add_movies:
+        graph.add_movie(movie_id, title, year)
+
+    for person_id, movie_id in add_stars:
+        m = graph.movie_index.get(movie_id)
+        stars = () if m is None else graph.stars_of(m)
+        costar = graph.person_ids[stars[0]] if len(stars) else None
+        # same as load_data, stars for unknown IDs are dropped
+        if not graph.add_star(person_id, movie_id):
+            continue
+        if components is not None and not relabel and costar is not None:
+            components.union(person_id, costar)
+
+    # removals can split components, which union-find can't undo
+    if relabel:
+        graph.component_labels = None
+        graph.component_index = None
+        degrees.components = graph.components()
+
+
+def compact():
+    """
+    Folds the changes applied to a graph backend into fresh arrays (see
+    Graph.compact) and rebuilds its name index. Changes don't need this
+    to be seen; it only pays off once many have piled up.
+    """
+    if degrees.graph is None or not degrees.graph.changed():
+        return
+    graph = degrees.graph.compact()
+    degrees.graph = graph
+    degrees.names = name_index(graph.person_names, graph.person_ids)
+    degrees.components = graph.components()
+    # both are indexed by row numbers, which compacting renumbers
+    degrees.name_search = None
+    degrees.landmark_index = None
+
+
+class PatchedNames():
+    """
+    The name index of a graph backend with people added and removed in
+    front of it, so a change doesn't rebuild it.
+    """
+    def __init__(self, base):
+        self.base = base
+        self.added = {}
+        self.removed = set()
+
+    def get(self, name, default=None):
+        person_ids = set(self.base.get(name, ())) - self.removed
+        person_ids |= self.added.get(name, set())
+        return person_ids or default
+
+    def __getitem__(self, name):
+        person_ids = self.get(name)
+        if person_ids is None:
+            raise KeyError(name)
+        return person_ids
+
+    def __contains__(self, name):
+        return self.get(name) is not None
+
+    def add(self, person_id, name):
+        self.added.setdefault(name.lower(), set()).add(person_id)
+
+    def remove(self, person_id):
+        self.removed.add(person_id)
+        for person_ids in self.added.values():
+            person_ids.discard(person_id)
+
+
+def apply_to_dicts(add_people, add_movies, add_stars,
+                   remove_people, remove_movies, remove_stars):
+    people, movies = degrees.people, degrees.movies
+    relabel = bool(remove_people or remove_movies or remove_stars)
+
+    for person_id, movie_id in remove_stars:
+        if person_id in people and movie_id in movies:
+            people[person_id]["movies"].discard(movie_id)
+            movies[movie_id]["stars"].discard(person_id)
+    for person_id in remove_people:
+        remove_person(person_id)
+    for movie_id in remove_movies:
+        remove_movie(movie_id)
+
+    # re-adding an existing ID replaces it
+    for row in add_people:
+        if row[0] in people:
+            remove_person(row[0])
+            relabel = True
+    for row in add_movies:
+        if row[0] in movies:
+            remove_movie(row[0])
+            relabel = True
+
+    components = degrees.components
+    for person_id, name, birth in add_people:
+        people[person_id] = {"name": name, "birth": str(birth), "movies": set()}
+        degrees.names.setdefault(name.lower(), set()).add(person_id)
+        if components is not None and not relabel:
+            components.add_person(person_id)
+    for movie_id, title, year in add_movies:
+        movies[movie_id] = {"title": title, "year": str(year), "stars": set()}
+
+    for person_id, movie_id in add_stars:
+        # same as load_data, stars for unknown IDs are dropped
+        if person_id not in people or movie_id not in movies:
+            continue
+        stars = movies[movie_id]["stars"]
+        if components is not None and not relabel and stars:
+            components.union(person_id, next(iter(stars)))
+        people[person_id]["movies"].add(movie_id)
+        stars.add(person_id)
+
+    # removals can split components, which union-find can't undo
+    if relabel:
+        degrees.components = degrees.dict_components()
+
+
+def remove_person(person_id):
+    person = degrees.people.pop(person_id, None)
+    if person is None:
+        return
+    for movie_id in person["movies"]:
+        degrees.movies[movie_id]["stars"].discard(person_id)
+    same_name = degrees.names.get(person["name"].lower())
+    if same_name is not None:
+        same_name.discard(person_id)
+        if not same_name:
+            del degrees.names[person["name"].lower()]
+
+
+def remove_movie(movie_id):
+    movie = degrees.movies.pop(movie_id, None)
+    if movie is None:
+        return
+    for person_id in movie["stars"]:
+        degrees.people[person_id]["movies"].discard(movie_id)
+
+
+def add_person(person_id, name, birth=""):
+    apply_changes(add_people=[(person_id, name, birth)])
+
+
+def add_movie(movie_id, title, year=""):
+    apply_changes(add_movies=[(movie_id, title, year)])
+
+
+def add_star(person_id, movie_id):
+    apply_changes(add_stars=[(person_id, movie_id)])
+
+
+def remove_star(person_id, movie_id):
+    apply_changes(remove_stars=[(person_id, movie_id)])
+
+
+def read_rows(directory, name, columns):
+    """Rows of an optional delta file as tuples of the given columns."""
+    path = os.path.join(directory, name)
+    if not os.path.exists(path):
+        return []
+    with open(path, encoding="utf-8") as f:
+        return [tuple(row[column] for column in columns)
+                for row in csv.DictReader(f)]
+
+
+def load_delta(directory):
+    """
+    Applies the delta files in a directory to the loaded data.
+
+    A path cache saved afterwards loads back with enable_cache once the
+    same delta is applied to the same data again.
+    """
+    apply_changes(
+        add_people=read_rows(directory, "people.csv", ("id", "name", "birth")),
+        add_movies=read_rows(directory, "movies.csv", ("id", "title", "year")),
+        add_stars=read_rows(directory, "stars.csv", ("person_id", "movie_id")),
+        remove_people=[row[0] for row in read_rows(directory, "removed_people.csv", ("id",))],
+        remove_movies=[row[0] for row in read_rows(directory, "removed_movies.csv", ("id",))],
+        remove_stars=read_rows(directory, "removed_stars.csv", ("person_id", "movie_id")),
+    )
@@ -0,0 +1,915 @@
+from array import array
+from bisect import bisect_left
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain, repeat
+from operator import sub
+
+from util import BUDGET_EXCEEDED, FOUND, NOT_CONNECTED, Budget, SearchResult
+from ingest import (CHUNK_SIZE, default_processes, intern_range, parse_range,
+                    shard_tasks, stream_columns)
+
+# typecode for every integer index array, 4 bytes is plenty for IMDb
+INDEX = "i"
+
+# placeholder stored in the year arrays when birth/year is blank
+NO_YEAR = 0
+
+
+class Graph():
+    """
+    Compact person <-> movie graph.
+
+    Person and movie IDs are interned to dense integers (their row number)
+    and the incidence between them is kept as two CSR structures:
+
+        person_movies[person_offsets[p]:person_offsets[p + 1]]
+            are the movies person p starred in, and
+
+        movie_people[movie_offsets[m]:movie_offsets[m + 1]]
+            are the people who starred in movie m.
+
+    Everything else is a flat array or list indexed by the same integers.
+
+    People, movies and stars can be added and removed in place (add_person,
+    remove_star, ...) without touching those arrays: a person or movie whose
+    row changes gets a patch array that movies_of and stars_of return
+    instead, new people and movies take the next indices, and removed ones
+    keep theirs as tombstones with no edges and no ID. compact() rebuilds
+    plain arrays once the patches are worth folding in.
+    """
+    def __init__(self, person_ids, person_names, person_births,
+                 movie_ids, movie_titles, movie_years,
+                 person_offsets, person_movies, movie_offsets, movie_people,
+                 person_index=None, movie_index=None, component_labels=None):
+        self.person_ids = person_ids
+        self.person_names = person_names
+        self.person_births = person_births
+        self.movie_ids = movie_ids
+        self.movie_titles = movie_titles
+        self.movie_years = movie_years
+        self.person_offsets = person_offsets
+        self.person_movies = person_movies
+        self.movie_offsets = movie_offsets
+        self.movie_people = movie_people
+
+        # string ID -> dense integer, anything with get() and [] will do
+        if person_index is None:
+            person_index = {pid: i for i, pid in enumerate(person_ids)}
+        if movie_index is None:
+            movie_index = {mid: i for i, mid in enumerate(movie_ids)}
+        self.person_index = person_index
+        self.movie_index = movie_index
+
+        # connected component of every person, computed on first use
+        # unless it came precomputed from a snapshot
+        self.component_labels = component_labels
+        self.component_index = None
+
+        # in-place changes, see add_person etc.
+        self.person_patches = {}
+        self.movie_patches = {}
+        self.removed_people = set()
+        self.removed_movies = set()
+        self.growable = False
+
+    @classmethod
+    def from_csv(cls, directory, chunk_size=CHUNK_SIZE, progress=None,
+                 processes=None):
+        """
+        Builds a graph straight from people.csv, movies.csv and stars.csv
+        without going through the nested dicts.
+
+        The files are streamed in chunks of `chunk_size` rows straight into
+        typed arrays, so peak memory is the graph itself plus one chunk.
+        `progress` is passed on to ingest.stream_columns.
+
+        With `processes` > 1 the files are parsed in parallel instead,
+        see from_csv_parallel.
+        """
+        if processes is not None and processes > 1:
+            return cls.from_csv_parallel(directory, processes, progress)
+
+        def stream(name, columns):
+            return stream_columns(f"{directory}/{name}", columns,
+                                  chunk_size=chunk_size, progress=progress)
+
+        person_ids, person_names, person_births = [], [], array(INDEX)
+        for ids, names, births in stream("people.csv", {
+            "id": str, "name": str, "birth": parse_year
+        }):
+            person_ids += ids
+            person_names += names
+            person_births.extend(births)
+
+        movie_ids, movie_titles, movie_years = [], [], array(INDEX)
+        for ids, titles, years in stream("movies.csv", {
+            "id": str, "title": str, "year": parse_year
+        }):
+            movie_ids += ids
+            movie_titles += titles
+            movie_years.extend(years)
+
+        person_index = {pid: i for i, pid in enumerate(person_ids)}
+        movie_index = {mid: i for i, mid in enumerate(movie_ids)}
+        edge_people, edge_movies = array(INDEX), array(INDEX)
+        for star_people, star_movies in stream("stars.csv", {
+            "person_id": person_index.get, "movie_id": movie_index.get
+        }):
+            for p, m in zip(star_people, star_movies):
+                # same as load_data, stars rows for unknown IDs are dropped
+                if p is not None and m is not None:
+                    edge_people.append(p)
+                    edge_movies.append(m)
+
+        return cls.from_edges(person_ids, person_names, person_births,
+                              movie_ids, movie_titles, movie_years,
+                              edge_people, edge_movies)
+
+    @classmethod
+    def from_csv_parallel(cls, directory, processes=None, progress=None):
+        """
+        Builds a graph by parsing byte-range shards of all three CSVs
+        in a pool of `processes` worker processes (default: one per core).
+
+        Each stars shard comes back with its own small ID tables, which are
+        merged into the global person/movie numbering here. `progress` is
+        called as in ingest.stream_columns, once per merged shard rather
+        than once per chunk.
+
+        Only the parsing is parallel: merging the shards and building the
+        CSR arrays (from_edges) still run in this process, and take about
+        as long as the parsing itself on large inputs.
+        """
+        processes = processes or default_processes()
+        people_tasks = shard_tasks(f"{directory}/people.csv", processes)
+        movie_tasks = shard_tasks(f"{directory}/movies.csv", processes)
+        star_tasks = shard_tasks(f"{directory}/stars.csv", processes)
+
+        def merged(name, futures, count):
+            """Shard results in file order, reporting rows merged so far."""
+            path = f"{directory}/{name}"
+            rows = 0
+            if progress is not None:
+                progress(path, rows)
+            for future in futures:
+                result = future.result()
+                yield result
+                rows += count(result)
+                if progress is not None:
+                    progress(path, rows)
+            if progress is not None:
+                progress(path, rows, done=True)
+
+        with ProcessPoolExecutor(processes) as pool:
+            people_futures = [
+                pool.submit(parse_range, *task,
+                            {"id": str, "name": str, "birth": parse_year})
+                for task in people_tasks
+            ]
+            movie_futures = [
+                pool.submit(parse_range, *task,
+                            {"id": str, "title": str, "year": parse_year})
+                for task in movie_tasks
+            ]
+            star_futures = [
+                pool.submit(intern_range, *task,
+                            ["person_id", "movie_id"])
+                for task in star_tasks
+            ]
+
+            # shards are merged in file order, so row numbers match from_csv
+            person_ids, person_names, person_births = [], [], array(INDEX)
+            for ids, names, births in merged("people.csv", people_futures,
+                                             lambda result: len(result[0])):
+                person_ids += ids
+                person_names += names
+                person_births.extend(births)
+
+            movie_ids, movie_titles, movie_years = [], [], array(INDEX)
+            for ids, titles, years in merged("movies.csv", movie_futures,
+                                             lambda result: len(result[0])):
+                movie_ids += ids
+                movie_titles += titles
+                movie_years.extend(years)
+
+            person_index = {pid: i for i, pid in enumerate(person_ids)}
+            movie_index = {mid: i for i, mid in enumerate(movie_ids)}
+            edge_people, edge_movies = array(INDEX), array(INDEX)
+            for (people_keys, people_codes), (movie_keys, movie_codes) in merged(
+                "stars.csv", star_futures, lambda result: len(result[0][1])
+            ):
+                # translate the shard's local codes to global indices, with
+                # -1 for unknown IDs, mapping in C rather than row by row
+                people_lookup = list(map(person_index.get, people_keys, repeat(-1)))
+                movie_lookup = list(map(movie_index.get, movie_keys, repeat(-1)))
+                shard_people = array(INDEX, map(people_lookup.__getitem__, people_codes))
+                shard_movies = array(INDEX, map(movie_lookup.__getitem__, movie_codes))
+                if -1 in people_lookup or -1 in movie_lookup:
+                    # same as load_data, stars rows for unknown IDs are dropped
+                    kept = [(p, m) for p, m in zip(shard_people, shard_movies)
+                            if p != -1 and m != -1]
+                    shard_people = array(INDEX, [p for p, _ in kept])
+                    shard_movies = array(INDEX, [m for _, m in kept])
+                edge_people.extend(shard_people)
+                edge_movies.extend(shard_movies)
+
+        return cls.from_edges(person_ids, person_names, person_births,
+                              movie_ids, movie_titles, movie_years,
+                              edge_people, edge_movies)
+
+    @classmethod
+    def from_dicts(cls, people, movies):
+        """
+        Builds a graph from the `people` and `movies` dicts of degrees.py.
+        """
+        person_ids = list(people)
+        movie_ids = list(movies)
+        movie_index = {mid: i for i, mid in enumerate(movie_ids)}
+
+        edge_people, edge_movies = array(INDEX), array(INDEX)
+        for p, person_id in enumerate(person_ids):
+            for movie_id in people[person_id]["movies"]:
+                edge_people.append(p)
+                edge_movies.append(movie_index[movie_id])
+
+        return cls.from_edges(
+            person_ids,
+            [people[pid]["name"] for pid in person_ids],
+            array(INDEX, (parse_year(people[pid]["birth"]) for pid in person_ids)),
+            movie_ids,
+            [movies[mid]["title"] for mid in movie_ids],
+            array(INDEX, (parse_year(movies[mid]["year"]) for mid in movie_ids)),
+            edge_people, edge_movies
+        )
+
+    @classmethod
+    def from_edges(cls, person_ids, person_names, person_births,
+                   movie_ids, movie_titles, movie_years,
+                   edge_people, edge_movies):
+        """
+        Builds both CSR directions from parallel arrays of
+        (person index, movie index) star edges. Duplicate edges are dropped.
+        """
+        person_offsets, person_movies = build_csr(
+            len(person_ids), edge_people, edge_movies
+        )
+        # the person side is already deduplicated, so build the movie side from it
+        movie_offsets, movie_people = build_csr(
+            len(movie_ids), person_movies, expand_rows(person_offsets)
+        )
+        return cls(person_ids, person_names, person_births,
+                   movie_ids, movie_titles, movie_years,
+                   person_offsets, person_movies, movie_offsets, movie_people)
+
+    def person_count(self):
+        """Number of person indices, tombstones included."""
+        return len(self.person_ids)
+
+    def movie_count(self):
+        """Number of movie indices, tombstones included."""
+        return len(self.movie_ids)
+
+    def people(self):
+        """Indices of every person that hasn't been removed."""
+        if not self.removed_people:
+            return range(self.person_count())
+        return [p for p in range(self.person_count()) if p not in self.removed_people]
+
+    def movies_of(self, p):
+        """Returns the movie indices person p starred in."""
+        return self.person_movies[self.person_offsets[p]:self.person_offsets[p + 1]]
+
+    def stars_of(self, m):
+        """Returns the person indices who starred in movie m."""
+        return self.movie_people[self.movie_offsets[m]:self.movie_offsets[m + 1]]
+
+    def patched_movies_of(self, p):
+        """movies_of once the graph has changed, see make_growable."""
+        if p in self.person_patches:
+            return self.person_patches[p]
+        return self.person_movies[self.person_offsets[p]:self.person_offsets[p + 1]]
+
+    def patched_stars_of(self, m):
+        """stars_of once the graph has changed, see make_growable."""
+        if m in self.movie_patches:
+            return self.movie_patches[m]
+        return self.movie_people[self.movie_offsets[m]:self.movie_offsets[m + 1]]
+
+    def degree(self, p):
+        """Number of movies person p starred in."""
+        if p in self.person_patches:
+            return len(self.person_patches[p])
+        return self.person_offsets[p + 1] - self.person_offsets[p]
+
+    def changed(self):
+        """True if anything was added or removed since the arrays were built."""
+        return bool(self.person_patches or self.movie_patches
+                    or self.removed_people or self.removed_movies)
+
+    def make_growable(self):
+        """
+        Prepares the graph for its first change: searches switch to the
+        patch-aware movies_of and stars_of (an unchanged graph never pays
+        for the patch lookups), and read-only tables (the views of a
+        snapshot) are wrapped so rows can be appended and IDs added and
+        removed. In-memory tables already can.
+        """
+        if self.growable:
+            return
+        self.growable = True
+        self.movies_of = self.patched_movies_of
+        self.stars_of = self.patched_stars_of
+        for name in ("person_ids", "person_names", "person_births",
+                     "movie_ids", "movie_titles", "movie_years",
+                     "component_labels"):
+            table = getattr(self, name)
+            if table is not None and not hasattr(table, "append"):
+                setattr(self, name, Extended(table))
+        for name in ("person_index", "movie_index"):
+            index = getattr(self, name)
+            if not hasattr(index, "__delitem__"):
+                setattr(self, name, PatchedIndex(index))
+        if self.component_index is not None:
+            self.component_index.labels = self.component_labels
+            self.component_index.index = self.person_index
+
+    def patch_person(self, p):
+        """Person p's movies as an array that can be edited in place."""
+        if p not in self.person_patches:
+            self.person_patches[p] = array(INDEX, self.movies_of(p))
+        return self.person_patches[p]
+
+    def patch_movie(self, m):
+        """Movie m's stars as an array that can be edited in place."""
+        if m not in self.movie_patches:
+            self.movie_patches[m] = array(INDEX, self.stars_of(m))
+        return self.movie_patches[m]
+
+    def add_person(self, person_id, name, birth=""):
+        """Adds a person with no movies, replacing any with the same ID."""
+        self.make_growable()
+        self.remove_person(person_id)
+        p = self.person_count()
+        self.person_ids.append(person_id)
+        self.person_names.append(name)
+        self.person_births.append(parse_year(str(birth)))
+        self.person_index[person_id] = p
+        self.person_patches[p] = array(INDEX)
+        return p
+
+    def add_movie(self, movie_id, title, year=""):
+        """Adds a movie with no stars, replacing any with the same ID."""
+        self.make_growable()
+        self.remove_movie(movie_id)
+        m = self.movie_count()
+        self.movie_ids.append(movie_id)
+        self.movie_titles.append(title)
+        self.movie_years.append(parse_year(str(year)))
+        self.movie_index[movie_id] = m
+        self.movie_patches[m] = array(INDEX)
+        return m
+
+    def add_star(self, person_id, movie_id):
+        """
+        Adds a star edge. Returns False, like load_data dropping the row,
+        if either ID is unknown.
+        """
+        p = self.person_index.get(person_id)
+        m = self.movie_index.get(movie_id)
+        if p is None or m is None:
+            return False
+        self.make_growable()
+        insert_sorted(self.patch_person(p), m)
+        insert_sorted(self.patch_movie(m), p)
+        return True
+
+    def remove_star(self, person_id, movie_id):
+        p = self.person_index.get(person_id)
+        m = self.movie_index.get(movie_id)
+        if p is None or m is None:
+            return
+        self.make_growable()
+        remove_sorted(self.patch_person(p), m)
+        remove_sorted(self.patch_movie(m), p)
+
+    def remove_person(self, person_id):
+        """Removes a person and their stars, leaving a tombstone index."""
+        p = self.person_index.get(person_id)
+        if p is None:
+            return
+        self.make_growable()
+        for m in self.movies_of(p):
+            remove_sorted(self.patch_movie(m), p)
+        self.person_patches[p] = array(INDEX)
+        self.removed_people.add(p)
+        del self.person_index[person_id]
+
+    def remove_movie(self, movie_id):
+        """Removes a movie and its stars, leaving a tombstone index."""
+        m = self.movie_index.get(movie_id)
+        if m is None:
+            return
+        self.make_growable()
+        for p in self.stars_of(m):
+            remove_sorted(self.patch_person(p), m)
+        self.movie_patches[m] = array(INDEX)
+        self.removed_movies.add(m)
+        del self.movie_index[movie_id]
+
+    def compact(self):
+        """
+        Returns a new Graph with every change folded into plain CSR arrays
+        and the tombstones dropped, renumbering the rows that are left.
+        """
+        person_rows = self.people()
+        movie_rows = [m for m in range(self.movie_count())
+                      if m not in self.removed_movies]
+
+        # old index -> new index
+        movie_map = array(INDEX, [-1]) * self.movie_count()
+        for new, old in enumerate(movie_rows):
+            movie_map[old] = new
+        edge_people, edge_movies = array(INDEX), array(INDEX)
+        for new, old in enumerate(person_rows):
+            movies = self.movies_of(old)
+            edge_people.extend(array(INDEX, [new]) * len(movies))
+            edge_movies.extend(movie_map[m] for m in movies)
+
+        return Graph.from_edges(
+            [self.person_ids[p] for p in person_rows],
+            [self.person_names[p] for p in person_rows],
+            array(INDEX, (self.person_births[p] for p in person_rows)),
+            [self.movie_ids[m] for m in movie_rows],
+            [self.movie_titles[m] for m in movie_rows],
+            array(INDEX, (self.movie_years[m] for m in movie_rows)),
+            edge_people, edge_movies
+        )
+
+    def neighbors(self, p):
+        """
+        Yields (movie index, person index) pairs for people
+        who starred with person p.
+        """
+        for m in self.movies_of(p):
+            for q in self.stars_of(m):
+                yield m, q
+
+    def neighbors_for_person(self, person_id):
+        """
+        Same contract as degrees.neighbors_for_person, in string IDs.
+        """
+        movie_ids, person_ids = self.movie_ids, self.person_ids
+        return {
+            (movie_ids[m], person_ids[q])
+            for m, q in self.neighbors(self.person_index[person_id])
+        }
+
+    def components(self):
+        """
+        Returns the Components of the graph, labelling them the first time.
+        """
+        if self.component_index is None:
+            if self.component_labels is None:
+                self.component_labels = label_components(
+                    self.person_count(),
+                    (self.stars_of(m) for m in range(self.movie_count()))
+                )
+                # removed people belong to no component
+                for p in self.removed_people:
+                    self.component_labels[p] = -1
+            self.component_index = Components(self.component_labels,
+                                              self.person_index)
+        return self.component_index
+
+    def shortest_path(self, source, target, max_degrees=None):
+        """
+        Breadth-first search over integer indices.
+
+        Takes and returns string IDs, the result is the usual
+        list of (movie_id, person_id) pairs, or None if not connected
+        (or not connected within max_degrees).
+        """
+        s = self.person_index[source]
+        t = self.person_index[target]
+        path = self.bfs(s, t, max_degrees)
+        if path is None:
+            return None
+        return [(self.movie_ids[m], self.person_ids[p]) for m, p in path]
+
+    def single_source(self, s):
+        """
+        Breadth-first search from person index s to everyone reachable.
+
+        Returns a SingleSource holding distance and predecessor arrays.
+        """
+        n = self.person_count()
+        distance = array(INDEX, [-1]) * n
+        parent_person = array(INDEX, [-1]) * n
+        parent_movie = array(INDEX, [-1]) * n
+        distance[s] = 0
+        seen_movies = bytearray(self.movie_count())
+
+        queue = deque([s])
+        while queue:
+            p = queue.popleft()
+            d = distance[p] + 1
+            for m in self.movies_of(p):
+                # each cast list only needs scanning once per search
+                if seen_movies[m]:
+                    continue
+                seen_movies[m] = 1
+                for q in self.stars_of(m):
+                    if distance[q] != -1:
+                        continue
+                    distance[q] = d
+                    parent_person[q] = p
+                    parent_movie[q] = m
+                    queue.append(q)
+        return SingleSource(self, s, distance, parent_person, parent_movie)
+
+    def bfs(self, s, t, max_degrees=None):
+        """
+        Breadth-first search from person index s to person index t,
+        trying paths of at most max_degrees hops if given.
+
+        Returns a list of (movie index, person index) pairs, or None.
+        """
+        return self.search(s, t, Budget(max_degrees=max_degrees)).path
+
+    def bounded_search(self, source, target, budget):
+        """
+        Same as search, taking and returning string IDs.
+        """
+        result = self.search(self.person_index[source],
+                             self.person_index[target], budget)
+        if result.path is not None:
+            result.path = [(self.movie_ids[m], self.person_ids[p])
+                           for m, p in result.path]
+        return result
+
+    def search(self, s, t, budget):
+        """
+        Breadth-first search from person index s to person index t
+        within a util.Budget.
+
+        Returns a util.SearchResult whose path is a list of
+        (movie index, person index) pairs when found.
+        """
+        if s == t:
+            return SearchResult(FOUND, [], 0)
+        n = self.person_count()
+        parent_person = array(INDEX, [-1]) * n
+        parent_movie = array(INDEX, [-1]) * n
+        visited = bytearray(n)
+        visited[s] = 1
+        seen_movies = bytearray(self.movie_count())
+
+        layer = [s]
+        degrees = 0
+        while layer:
+            degrees += 1
+            if not budget.allows_depth(degrees):
+                return SearchResult(BUDGET_EXCEEDED, None, budget.expanded,
+                                    budget.exceeded)
+            next_layer = []
+            for p in layer:
+                if not budget.expand():
+                    return SearchResult(BUDGET_EXCEEDED, None, budget.expanded,
+                                        budget.exceeded)
+                for m in self.movies_of(p):
+                    # each cast list only needs scanning once per search
+                    if seen_movies[m]:
+                        continue
+                    seen_movies[m] = 1
+                    for q in self.stars_of(m):
+                        if visited[q]:
+                            continue
+                        visited[q] = 1
+                        parent_person[q] = p
+                        parent_movie[q] = m
+                        if q == t:
+                            path = trace_back(t, parent_person, parent_movie)
+                            return SearchResult(FOUND, path, budget.expanded)
+                        next_layer.append(q)
+            layer = next_layer
+        return SearchResult(NOT_CONNECTED, None, budget.expanded)
+
+
+class SingleSource():
+    """
+    Result of one full breadth-first search from a single person.
+
+    distance[p] is the number of hops from the source to person p
+    (-1 if unreachable), and parent_person[p] / parent_movie[p] is the
+    person and movie p was first reached through (-1 for the source and
+    unreachable people). All three are flat arrays indexed by person.
+    """
+    def __init__(self, graph, source, distance, parent_person, parent_movie):
+        self.graph = graph
+        self.source = source
+        self.distance = distance
+        self.parent_person = parent_person
+        self.parent_movie = parent_movie
+
+    def reached(self, p):
+        return self.distance[p] != -1
+
+    def path_to(self, t):
+        """
+        Returns the (movie index, person index) path from the source to
+        person index t in O(path length), or None if t is unreachable.
+        """
+        if not self.reached(t):
+            return None
+        return trace_back(t, self.parent_person, self.parent_movie)
+
+    def path(self, target):
+        """Same as path_to, in string IDs."""
+        path = self.path_to(self.graph.person_index[target])
+        if path is None:
+            return None
+        return [(self.graph.movie_ids[m], self.graph.person_ids[p])
+                for m, p in path]
+
+    def histogram(self):
+        """
+        Returns a list whose d-th entry is how many people are exactly
+        d hops from the source.
+        """
+        counts = []
+        for d in self.distance:
+            if d == -1:
+                continue
+            while len(counts) <= d:
+                counts.append(0)
+            counts[d] += 1
+        return counts
+
+
+class Components():
+    """
+    Connected components of the co-star graph.
+
+    labels[p] is the component of person index p, components are numbered
+    0, 1, ... in order of their first person, and -1 marks a removed person.
+    `index` maps person IDs to person indices, so connected() takes IDs.
+
+    When labels and index are growable (an array and a dict), people and
+    co-star links can be added in place with add_person and union; merged
+    components are then tracked by a small label -> label map rather than
+    relabelling anyone.
+    """
+    def __init__(self, labels, index):
+        self.labels = labels
+        self.index = index
+        self.merged = {}
+        self.label_count = max(labels, default=-1) + 1
+        self.component_sizes = None
+
+    def root(self, label):
+        """The label a component ended up under after any merges."""
+        while label in self.merged:
+            label = self.merged[label]
+        return label
+
+    def label_of(self, person_id):
+        return self.root(self.labels[self.index[person_id]])
+
+    @property
+    def sizes(self):
+        """
+        sizes[c] is the number of people in component c
+        (0 for labels merged into another component).
+        """
+        if self.component_sizes is None:
+            sizes = array(INDEX, [0]) * self.label_count
+            for label in self.labels:
+                if label != -1:
+                    sizes[self.root(label)] += 1
+            self.component_sizes = sizes
+        return self.component_sizes
+
+    def connected(self, source, target):
+        """True if some path joins the two person IDs, in O(1)."""
+        return self.label_of(source) == self.label_of(target)
+
+    def size_of(self, person_id):
+        """Number of people in the person's component, themself included."""
+        return self.sizes[self.label_of(person_id)]
+
+    def add_person(self, person_id):
+        """Gives a new person a component of their own."""
+        self.index[person_id] = len(self.labels)
+        self.labels.append(self.label_count)
+        self.label_count += 1
+        self.component_sizes = None
+
+    def union(self, source, target):
+        """Records that two people are now connected."""
+        a, b = self.label_of(source), self.label_of(target)
+        if a != b:
+            self.merged[max(a, b)] = min(a, b)
+            self.component_sizes = None
+
+    def stats(self):
+        """
+        Summary of component sizes: how many components there are, the
+        largest one, how many people have no co-stars at all, and a
+        histogram mapping each component size to how many components
+        have it.
+        """
+        histogram = {}
+        for size in self.sizes:
+            if size:
+                histogram[size] = histogram.get(size, 0) + 1
+        return {
+            "components": sum(histogram.values()),
+            "people": sum(self.sizes),
+            "largest": max(self.sizes, default=0),
+            "isolated": histogram.get(1, 0),
+            "histogram": dict(sorted(histogram.items())),
+        }
+
+
+class Extended():
+    """
+    A read-only table (a snapshot view) plus rows appended after it,
+    so a mapped graph can grow without copying its tables.
+    """
+    def __init__(self, base):
+        self.base = base
+        self.size = len(base)
+        self.extra = []
+
+    def __len__(self):
+        return self.size + len(self.extra)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        if i < self.size:
+            return self.base[i]
+        return self.extra[i - self.size]
+
+    def __setitem__(self, i, value):
+        if i < self.size:
+            raise TypeError("rows of the base table are read-only")
+        self.extra[i - self.size] = value
+
+    def __iter__(self):
+        return chain(self.base, self.extra)
+
+    def append(self, value):
+        self.extra.append(value)
+
+
+class PatchedIndex():
+    """
+    A read-only ID index (a snapshot SortedIndex) with IDs added and
+    removed in front of it.
+    """
+    def __init__(self, base):
+        self.base = base
+        self.added = {}
+        self.removed = set()
+
+    def get(self, key, default=None):
+        if key in self.added:
+            return self.added[key]
+        if key in self.removed:
+            return default
+        return self.base.get(key, default)
+
+    def __getitem__(self, key):
+        value = self.get(key)
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def __contains__(self, key):
+        return self.get(key) is not None
+
+    def __setitem__(self, key, value):
+        self.added[key] = value
+        self.removed.discard(key)
+
+    def __delitem__(self, key):
+        self.added.pop(key, None)
+        self.removed.add(key)
+
+
+def insert_sorted(row, value):
+    """Adds value to a sorted array unless it's already there."""
+    k = bisect_left(row, value)
+    if k == len(row) or row[k] != value:
+        row.insert(k, value)
+
+
+def remove_sorted(row, value):
+    k = bisect_left(row, value)
+    if k < len(row) and row[k] == value:
+        del row[k]
+
+
+def label_components(n, groups):
+    """
+    Labels the connected components of n people, given groups of person
+    indices that are all connected to each other (the cast of each movie).
+
+    Union-find with path halving, then relabelled densely in order of
+    first appearance. Returns an array of n labels.
+    """
+    parent = array(INDEX, range(n))
+
+    def find(p):
+        while parent[p] != p:
+            parent[p] = parent[parent[p]]
+            p = parent[p]
+        return p
+
+    for group in groups:
+        first = None
+        for p in group:
+            if first is None:
+                first = find(p)
+                continue
+            root = find(p)
+            if root != first:
+                # keep the smaller index as root, it doesn't matter which
+                if root < first:
+                    root, first = first, root
+                parent[root] = first
+
+    labels = array(INDEX, [-1]) * n
+    roots = {}
+    for p in range(n):
+        labels[p] = roots.setdefault(find(p), len(roots))
+    return labels
+
+
+def trace_back(t, parent_person, parent_movie):
+    """
+    Follows parent arrays back from t to the root of the search.
+    """
+    path = []
+    while parent_person[t] != -1:
+        path.append((parent_movie[t], t))
+        t = parent_person[t]
+    path.reverse()
+    return path
+
+
+def build_csr(rows, edge_rows, edge_cols):
+    """
+    Builds (offsets, columns) CSR arrays from parallel edge arrays,
+    with each row's columns sorted and deduplicated.
+    """
+    counts = array(INDEX, [0]) * (rows + 1)
+    for r in edge_rows:
+        counts[r + 1] += 1
+    for r in range(rows):
+        counts[r + 1] += counts[r]
+
+    # counting sort the columns into their rows
+    columns = array(INDEX, [0]) * len(edge_cols)
+    cursor = array(INDEX, counts)
+    for r, c in zip(edge_rows, edge_cols):
+        columns[cursor[r]] = c
+        cursor[r] += 1
+
+    # compact each row in place, dropping duplicate edges
+    offsets = array(INDEX, [0]) * (rows + 1)
+    write = 0
+    for r in range(rows):
+        row = sorted(set(columns[counts[r]:counts[r + 1]]))
+        columns[write:write + len(row)] = array(INDEX, row)
+        write += len(row)
+        offsets[r + 1] = write
+    del columns[write:]
+
+    return offsets, columns
+
+
+def expand_rows(offsets):
+    """
+    Inverse of the offsets array: the row index of every column entry.
+    """
+    lengths = map(sub, offsets[1:], offsets[:-1])
+    return array(INDEX, chain.from_iterable(map(repeat, range(len(offsets) - 1),
+                                                lengths)))
+
+
+def parse_year(value):
+    """Parses a birth/year CSV cell, blank cells become NO_YEAR."""
+    try:
+        return int(value)
+    except ValueError:
+        return NO_YEAR
+
+
+def format_year(value):
+    """Inverse of parse_year, in the string form degrees.py prints."""
+    return "" if value == NO_YEAR else str(value)
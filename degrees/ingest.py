@@ -0,0 +1,157 @@
+"""
+Streaming CSV ingestion for the degrees dataset.
+
+Rows are read with a plain csv.reader and handed out in fixed-size chunks
+of typed columns, so callers can fold them into compact arrays without ever
+holding a dict per row.
+
+For multi-core loading a file can instead be split into byte ranges on line
+boundaries and each range parsed in a separate process. That assumes no
+quoted field spans a line, which holds for the IMDb exports.
+"""
+import csv
+import io
+import os
+import sys
+import time
+from array import array
+
+# rows per chunk, big enough to amortize the per-chunk work
+CHUNK_SIZE = 65536
+
+
+def stream_columns(path, columns, chunk_size=CHUNK_SIZE, progress=None):
+    """
+    Yields chunks of `path` as a tuple of lists, one per requested column.
+
+    `columns` maps each wanted header name to a parser applied to every
+    cell (str to keep it as text). `progress`, if given, is called as
+    progress(path, rows_so_far) before the first chunk and after every
+    full one, and as progress(path, total_rows, done=True) once at the
+    end, so it must accept a `done` keyword (ProgressReporter does).
+    """
+    with open(path, encoding="utf-8", newline="") as f:
+        reader = csv.reader(f)
+        header = next(reader)
+        positions = [header.index(name) for name in columns]
+        parsers = list(columns.values())
+
+        rows = 0
+        if progress is not None:
+            progress(path, rows)
+        chunk = tuple([] for _ in columns)
+        for row in reader:
+            for values, position, parse in zip(chunk, positions, parsers):
+                values.append(parse(row[position]))
+            if len(chunk[0]) == chunk_size:
+                rows += chunk_size
+                yield chunk
+                if progress is not None:
+                    progress(path, rows)
+                chunk = tuple([] for _ in columns)
+
+        if chunk[0]:
+            rows += len(chunk[0])
+            yield chunk
+        if progress is not None:
+            progress(path, rows, done=True)
+
+
+class ProgressReporter():
+    """
+    Progress callback for stream_columns that prints rows/sec,
+    at most once every `interval` seconds per file, and always
+    when called with done=True.
+    """
+    def __init__(self, stream=sys.stderr, interval=1.0):
+        self.stream = stream
+        self.interval = interval
+        self.started = {}
+        self.reported = {}
+
+    def __call__(self, path, rows, done=False):
+        now = time.perf_counter()
+        started = self.started.setdefault(path, now)
+        if not done and now - self.reported.get(path, started) < self.interval:
+            return
+        self.reported[path] = now
+        elapsed = max(now - started, 1e-9)
+        status = "done" if done else "loading"
+        print(f"{path}: {rows:,} rows {status} ({rows / elapsed:,.0f} rows/sec)",
+              file=self.stream)
+
+
+def shard_ranges(path, shards):
+    """
+    Splits the rows of a CSV file (everything after the header) into at most
+    `shards` (start, end) byte ranges, each starting at the start of a line.
+    """
+    size = os.path.getsize(path)
+    with open(path, "rb") as f:
+        f.readline()
+        start = f.tell()
+        bounds = [start]
+        step = max((size - start) // shards, 1)
+        for i in range(1, shards):
+            f.seek(max(start + i * step, bounds[-1]))
+            # finish the line we landed in, the next range starts after it
+            f.readline()
+            if f.tell() >= size:
+                break
+            if f.tell() > bounds[-1]:
+                bounds.append(f.tell())
+        bounds.append(size)
+    return list(zip(bounds, bounds[1:]))
+
+
+def read_range(path, start, end):
+    """
+    Returns the header and a csv.reader over one byte range of a CSV file.
+    """
+    with open(path, "rb") as f:
+        header = next(csv.reader([f.readline().decode("utf-8")]))
+        f.seek(start)
+        text = f.read(end - start).decode("utf-8")
+    return header, csv.reader(io.StringIO(text, newline=""))
+
+
+def parse_range(path, start, end, columns):
+    """
+    Parses one byte range into a tuple of lists, one per requested column,
+    same as a single stream_columns chunk.
+    """
+    header, reader = read_range(path, start, end)
+    positions = [header.index(name) for name in columns]
+    parsers = list(columns.values())
+    chunk = tuple([] for _ in columns)
+    for row in reader:
+        for values, position, parse in zip(chunk, positions, parsers):
+            values.append(parse(row[position]))
+    return chunk
+
+
+def intern_range(path, start, end, columns):
+    """
+    Parses one byte range, interning each requested column to local codes.
+
+    Returns one (keys, codes) pair per column: keys lists every distinct
+    string in the range once, codes is an array of indices into keys, one
+    per row. Shipping that back is far cheaper than one string per row.
+    """
+    header, reader = read_range(path, start, end)
+    positions = [header.index(name) for name in columns]
+    tables = [{} for _ in columns]
+    codes = [array("i") for _ in columns]
+    for row in reader:
+        for table, column, position in zip(tables, codes, positions):
+            column.append(table.setdefault(row[position], len(table)))
+    return [(list(table), column) for table, column in zip(tables, codes)]
+
+
+def shard_tasks(path, processes):
+    """(path, start, end) for every shard of path, a few shards per process."""
+    return [(path, start, end) for start, end in shard_ranges(path, processes * 4)]
+
+
+def default_processes():
+    return os.cpu_count() or 1
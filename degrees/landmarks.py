@@ -0,0 +1,170 @@
+"""
+Landmark distance oracle for approximate degrees of separation.
+
+A handful of well-connected people are picked as landmarks and one full
+BFS is run from each. For any pair (s, t) and landmark L, the triangle
+inequality gives
+
+    |d(L, s) - d(L, t)|  <=  d(s, t)  <=  d(L, s) + d(L, t)
+
+so taking the best bound over all landmarks brackets the true distance
+with a few array lookups and no search. Distances are stored person-major,
+one byte per landmark, so a person's row is one contiguous slice.
+
+NumPy is used to answer many pairs at once when it is installed; without
+it the same bounds are computed pair by pair.
+"""
+import os
+import struct
+from array import array
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# default number of landmarks
+LANDMARKS = 16
+
+# stored distance for people a landmark can't reach, so the table fits in bytes
+UNREACHABLE = 255
+
+# magic, person count, landmark count, fingerprint of the data (hex sha256)
+HEADER = struct.Struct("<8sII64s")
+MAGIC = b"DEGLMRK2"
+
+
+class LandmarkIndex():
+    """
+    Distance bounds between any two people of a graph.Graph from
+    BFS distances to `landmarks`, a list of person indices.
+    """
+    def __init__(self, graph, landmarks, table):
+        self.graph = graph
+        self.landmarks = landmarks
+        self.table = table
+        self.k = len(landmarks)
+
+    @classmethod
+    def build(cls, graph, k=LANDMARKS):
+        """
+        Picks the k people with the most movies as landmarks and runs
+        one BFS from each.
+        """
+        by_degree = sorted(graph.people(), key=graph.degree, reverse=True)
+        landmarks = by_degree[:k]
+
+        n = graph.person_count()
+        table = array("B", [UNREACHABLE]) * (n * len(landmarks))
+        for column, landmark in enumerate(landmarks):
+            distance = graph.single_source(landmark).distance
+            for p in range(n):
+                d = distance[p]
+                if d != -1:
+                    table[p * len(landmarks) + column] = min(d, UNREACHABLE - 1)
+        return cls(graph, landmarks, table)
+
+    def row(self, p):
+        return self.table[p * self.k:(p + 1) * self.k]
+
+    def bounds_for(self, s, t):
+        """
+        (lower, upper) bounds on the distance between person indices s and
+        t, or None if no landmark reaches both. They may still be connected
+        in a component without a landmark, see degrees.approximate_degrees.
+        """
+        if s == t:
+            return 0, 0
+        lower, upper = 1, None
+        for a, b in zip(self.row(s), self.row(t)):
+            if a == UNREACHABLE or b == UNREACHABLE:
+                continue
+            lower = max(lower, abs(a - b))
+            upper = a + b if upper is None else min(upper, a + b)
+        if upper is None:
+            return None
+        return lower, upper
+
+    def bounds(self, source, target):
+        """bounds_for, taking person IDs."""
+        index = self.graph.person_index
+        return self.bounds_for(index[source], index[target])
+
+    def many_bounds(self, pairs):
+        """
+        Bounds for many (source, target) person ID pairs at once.
+
+        Returns a list of (lower, upper) tuples, or None for pairs no
+        landmark reaches both of. Vectorized with NumPy if available.
+        """
+        index = self.graph.person_index
+        sources = [index[source] for source, _ in pairs]
+        targets = [index[target] for _, target in pairs]
+        if numpy is None or not pairs:
+            return [self.bounds_for(s, t) for s, t in zip(sources, targets)]
+
+        table = numpy.frombuffer(self.table, dtype=numpy.uint8).reshape(-1, self.k)
+        a = table[sources].astype(numpy.int32)
+        b = table[targets].astype(numpy.int32)
+        usable = (a != UNREACHABLE) & (b != UNREACHABLE)
+        upper = numpy.where(usable, a + b, numpy.iinfo(numpy.int32).max).min(axis=1)
+        lower = numpy.maximum(numpy.where(usable, numpy.abs(a - b), 0).max(axis=1), 1)
+        found = usable.any(axis=1)
+        same = numpy.asarray(sources) == numpy.asarray(targets)
+
+        results = []
+        for i in range(len(pairs)):
+            if same[i]:
+                results.append((0, 0))
+            elif found[i]:
+                results.append((int(lower[i]), int(upper[i])))
+            else:
+                results.append(None)
+        return results
+
+    def distance(self, source, target, exact=False):
+        """
+        Returns (lower, upper) bounds for two person IDs, or with exact=True
+        the true number of degrees from a BFS (lower == upper). None means
+        not connected, or for bounds that no landmark reaches them.
+        """
+        if not exact:
+            return self.bounds(source, target)
+        path = self.graph.shortest_path(source, target)
+        if path is None:
+            return None if source != target else (0, 0)
+        return len(path), len(path)
+
+    def save(self, path, fingerprint=""):
+        """
+        Writes the landmarks and distance table to a file, tagged with the
+        fingerprint of the data they were built from (see cache.fingerprint).
+        """
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(HEADER.pack(MAGIC, self.graph.person_count(), self.k,
+                                fingerprint.encode()))
+            array("i", self.landmarks).tofile(f)
+            f.write(self.table)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, graph, path, fingerprint=""):
+        """
+        Reads an index written by save, for the same graph and data.
+        Raises ValueError if it was saved for anything else.
+        """
+        with open(path, "rb") as f:
+            try:
+                magic, n, k, saved = HEADER.unpack(f.read(HEADER.size))
+            except struct.error:
+                raise ValueError(f"{path} is not a landmark index")
+            if magic != MAGIC:
+                raise ValueError(f"{path} is not a landmark index")
+            if n != graph.person_count() or saved.rstrip(b"\0").decode() != fingerprint:
+                raise ValueError(f"{path} was built for a different graph")
+            landmarks = array("i")
+            landmarks.fromfile(f, k)
+            table = array("B")
+            table.frombytes(f.read())
+        return cls(graph, list(landmarks), table)
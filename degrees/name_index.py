@@ -0,0 +1,147 @@
+"""
+Name search over the people table.
+
+Names are normalized (case-folded, accents stripped, whitespace collapsed)
+and kept in one sorted list, which answers exact and prefix lookups by
+binary search. Edit-distance lookups walk a trie of the same keys, pruning
+any branch that can no longer come within the allowed distance; the trie is
+only built the first time a fuzzy lookup needs it.
+"""
+import heapq
+import unicodedata
+from bisect import bisect_left
+from collections import namedtuple
+
+# default number of candidates returned by a lookup
+LIMIT = 10
+
+# trie key holding the person indices whose name ends at that node
+END = ""
+
+Candidate = namedtuple(
+    "Candidate", ["person_id", "name", "birth", "movie_count", "distance"]
+)
+
+
+def normalize(name):
+    """
+    Case- and accent-insensitive form of a name: "Penélope  Cruz"
+    and "penelope cruz" both become "penelope cruz".
+    """
+    decomposed = unicodedata.normalize("NFKD", name)
+    stripped = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return " ".join(stripped.casefold().split())
+
+
+class NameSearch():
+    """
+    Ranked exact, prefix and fuzzy lookup of people by name.
+
+    Built from parallel sequences indexed by person: IDs, names,
+    birth years (as strings) and movie counts.
+    """
+    def __init__(self, person_ids, person_names, births, movie_counts):
+        self.person_ids = person_ids
+        self.person_names = person_names
+        self.births = births
+        self.movie_counts = movie_counts
+
+        entries = sorted(
+            (normalize(name), i) for i, name in enumerate(person_names)
+        )
+        self.keys = [key for key, _ in entries]
+        self.rows = [i for _, i in entries]
+        self.trie = None
+
+    def candidate(self, row, distance=0):
+        return Candidate(self.person_ids[row], self.person_names[row],
+                         self.births[row], self.movie_counts[row], distance)
+
+    def rank_key(self, match):
+        row, distance = match
+        return (distance, -self.movie_counts[row], self.person_names[row],
+                self.person_ids[row])
+
+    def rank(self, matches, limit):
+        """
+        Orders (row, distance) matches: closest first, then the person
+        with the most movies, then by name. With a limit, the best few
+        are picked with a heap instead of sorting every match, and only
+        those become Candidates.
+        """
+        if limit is None:
+            best = sorted(matches, key=self.rank_key)
+        else:
+            best = heapq.nsmallest(limit, matches, key=self.rank_key)
+        return [self.candidate(row, distance) for row, distance in best]
+
+    def key_range(self, lo, hi):
+        return ((self.rows[k], 0) for k in range(lo, hi))
+
+    def exact(self, name, limit=LIMIT):
+        """People whose normalized name equals normalize(name)."""
+        key = normalize(name)
+        lo = bisect_left(self.keys, key)
+        hi = lo
+        while hi < len(self.keys) and self.keys[hi] == key:
+            hi += 1
+        return self.rank(self.key_range(lo, hi), limit)
+
+    def prefix(self, name, limit=LIMIT):
+        """People whose normalized name starts with normalize(name)."""
+        key = normalize(name)
+        lo = bisect_left(self.keys, key)
+        hi = bisect_left(self.keys, key + "\U0010ffff", lo)
+        return self.rank(self.key_range(lo, hi), limit)
+
+    def fuzzy(self, name, max_distance=2, limit=LIMIT):
+        """
+        People whose normalized name is within `max_distance` edits
+        (insertions, deletions, substitutions) of normalize(name).
+        """
+        key = normalize(name)
+        if self.trie is None:
+            self.trie = self.build_trie()
+
+        matches = []
+        first_row = list(range(len(key) + 1))
+        # depth-first walk, carrying the Levenshtein row for each trie prefix
+        stack = [(child, char, first_row) for char, child in self.trie.items()
+                 if char != END]
+        while stack:
+            node, char, previous = stack.pop()
+            row = [previous[0] + 1]
+            for i in range(1, len(key) + 1):
+                row.append(min(
+                    row[i - 1] + 1,
+                    previous[i] + 1,
+                    previous[i - 1] + (key[i - 1] != char),
+                ))
+            if row[-1] <= max_distance and END in node:
+                matches.extend((r, row[-1]) for r in node[END])
+            # no completion of this prefix can get closer than its best cell
+            if min(row) <= max_distance:
+                stack.extend((child, c, row) for c, child in node.items()
+                             if c != END)
+        return self.rank(matches, limit)
+
+    def build_trie(self):
+        trie = {}
+        for key, row in zip(self.keys, self.rows):
+            node = trie
+            for char in key:
+                node = node.setdefault(char, {})
+            node.setdefault(END, []).append(row)
+        return trie
+
+    def search(self, name, mode="exact", max_distance=2, limit=LIMIT):
+        """
+        Dispatches to exact, prefix or fuzzy by `mode`.
+        """
+        if mode == "exact":
+            return self.exact(name, limit)
+        if mode == "prefix":
+            return self.prefix(name, limit)
+        if mode == "fuzzy":
+            return self.fuzzy(name, max_distance, limit)
+        raise ValueError(f"unknown name search mode: {mode}")
@@ -0,0 +1,202 @@
+"""
+Resident degrees query server.
+
+Loads the graph once per worker process and answers queries over HTTP on a
+local port, so a query costs a search instead of a full load_data:
+
+    python server.py [directory] [port] [workers]
+
+    GET /path?source=Kevin+Bacon&target=Tom+Hanks&timeout=2&max_degrees=6
+    GET /lookup?name=tom+h&mode=prefix&limit=5
+
+Sources and targets may be names or person IDs. Every response is a JSON
+object. Searches run in a process pool so a slow query never blocks a fast
+one; with the default snapshot backend every worker maps the same snapshot
+file, so the graph is only resident once.
+"""
+import asyncio
+import json
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from urllib.parse import parse_qs, urlsplit
+
+import degrees
+from batch import resolve
+from ingest import default_processes
+
+HOST = "127.0.0.1"
+PORT = 8050
+
+# seconds a query may search for, the search budget of every /path request
+TIMEOUT = 10.0
+
+# extra seconds the server waits on a worker past the timeout before a 504
+GRACE = 1.0
+
+# longest request line or header the server accepts
+MAX_LINE = 8192
+
+STATUS = {
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    500: "Internal Server Error",
+    504: "Gateway Timeout",
+}
+
+
+def load_worker(directory, backend):
+    """
+    Process pool initializer: each worker loads the graph once, and builds
+    its name search up front so no /lookup pays for that.
+    """
+    degrees.load_data(directory, backend)
+    degrees.name_search = degrees.build_name_search()
+
+
+def find_path(source, target, max_degrees, timeout):
+    """
+    Runs in a worker: resolves both people and searches between them
+    within the request's budgets, so a worker never stays busy with a
+    query the server has already given up on.
+    """
+    source_id, error = resolve(source)
+    if error:
+        return error
+    target_id, error = resolve(target)
+    if error:
+        return error
+
+    result = degrees.search(source_id, target_id, max_degrees, timeout=timeout)
+    path = result.path
+    return {
+        "status": result.status,
+        "expanded": result.expanded,
+        "exceeded": result.exceeded,
+        "source_id": source_id,
+        "source_name": degrees.person_name(source_id),
+        "target_id": target_id,
+        "degrees": None if path is None else len(path),
+        "path": None if path is None else [
+            {"movie_id": movie_id, "movie": degrees.movie_title(movie_id),
+             "person_id": person_id, "person": degrees.person_name(person_id)}
+            for movie_id, person_id in path
+        ],
+    }
+
+
+def lookup(name, mode, limit):
+    """Runs in a worker: ranked name search, see degrees.find_people."""
+    candidates = degrees.find_people(name, mode, limit=limit)
+    return {"candidates": [candidate._asdict() for candidate in candidates]}
+
+
+class Server():
+    """
+    Minimal asyncio HTTP/1.1 server in front of a process pool.
+    """
+    def __init__(self, directory, backend="snapshot", workers=None,
+                 timeout=TIMEOUT):
+        self.timeout = timeout
+        self.pool = ProcessPoolExecutor(
+            workers or default_processes(),
+            initializer=load_worker,
+            initargs=(directory, backend),
+        )
+
+    async def serve(self, host=HOST, port=PORT):
+        server = await asyncio.start_server(self.handle, host, port,
+                                            limit=MAX_LINE)
+        async with server:
+            await server.serve_forever()
+
+    def close(self):
+        self.pool.shutdown(cancel_futures=True)
+
+    async def handle(self, reader, writer):
+        try:
+            status, body = await self.respond(reader)
+        except (ValueError, asyncio.LimitOverrunError):
+            status, body = 400, {"error": "bad request"}
+        except Exception as e:
+            # answer anyway, rather than drop the connection
+            status, body = 500, {"error": f"{type(e).__name__}: {e}"}
+        payload = json.dumps(body).encode()
+        writer.write(
+            f"HTTP/1.1 {status} {STATUS[status]}\r\n"
+            "Content-Type: application/json\r\n"
+            f"Content-Length: {len(payload)}\r\n"
+            "Connection: close\r\n\r\n".encode() + payload
+        )
+        try:
+            await writer.drain()
+        finally:
+            writer.close()
+
+    async def respond(self, reader):
+        """Reads one request and returns (status, JSON body)."""
+        request_line = (await reader.readline()).decode("latin-1")
+        # skip headers, every parameter is in the query string
+        while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+            pass
+
+        method, target, _ = request_line.split(" ", 2)
+        if method != "GET":
+            return 400, {"error": "only GET is supported"}
+        url = urlsplit(target)
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        timeout = float(query.get("timeout", self.timeout))
+
+        if url.path == "/path":
+            if "source" not in query or "target" not in query:
+                return 400, {"error": "source and target are required"}
+            max_degrees = query.get("max_degrees")
+            call = (find_path, query["source"], query["target"],
+                    None if max_degrees is None else int(max_degrees), timeout)
+        elif url.path == "/lookup":
+            if "name" not in query:
+                return 400, {"error": "name is required"}
+            call = (lookup, query["name"], query.get("mode", "exact"),
+                    int(query.get("limit", 10)))
+        else:
+            return 404, {"error": f"no such endpoint: {url.path}"}
+
+        loop = asyncio.get_running_loop()
+        try:
+            result = await asyncio.wait_for(
+                loop.run_in_executor(self.pool, *call), timeout + GRACE
+            )
+        except asyncio.TimeoutError:
+            return 504, {"error": "timed out", "timeout": timeout}
+        except ValueError as e:
+            return 400, {"error": str(e)}
+        except BrokenProcessPool:
+            # a worker died (out of memory, killed), the pool can't recover
+            return 500, {"error": "worker pool is broken"}
+        return 200, result
+
+
+def main():
+    if len(sys.argv) > 4:
+        sys.exit("Usage: python server.py [directory] [port] [workers]")
+    directory = sys.argv[1] if len(sys.argv) >= 2 else "large"
+    port = int(sys.argv[2]) if len(sys.argv) >= 3 else PORT
+    workers = int(sys.argv[3]) if len(sys.argv) == 4 else None
+
+    # compile the snapshot up front rather than once in every worker
+    print("Loading data...")
+    degrees.load_data(directory, "snapshot")
+    print(f"Serving on http://{HOST}:{port}")
+
+    server = Server(directory, workers=workers)
+    try:
+        asyncio.run(server.serve(HOST, port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,329 @@
+"""
+Binary snapshots of a degrees Graph.
+
+A snapshot is a single file holding the ID tables, the CSR adjacency arrays,
+a name index and the connected component of every person, laid out so it
+can be memory-mapped and used in place: nothing is parsed at load time, so
+startup is near-instant and every process that maps the same file on a host
+shares its pages.
+
+Compile one with:
+
+    python snapshot.py [directory]
+"""
+import mmap
+import os
+import struct
+import sys
+from array import array
+
+from graph import Graph, INDEX
+from ingest import ProgressReporter, default_processes
+
+MAGIC = b"DEGSNAP2"
+
+# default snapshot file name, kept inside the dataset directory
+FILENAME = "graph.snapshot"
+
+# CSVs a snapshot is compiled from, used to detect a stale snapshot
+SOURCES = ("people.csv", "movies.csv", "stars.csv")
+
+# header: magic, byte order, section count
+HEADER = struct.Struct("<8s8sI")
+# one per section: name, typecode, offset, length in bytes
+SECTION = struct.Struct("<16s1sQQ")
+
+# every section starts on a multiple of this, so the casts are aligned
+ALIGN = 8
+
+# offsets into string blobs can get past 2 GiB on a full dump
+BLOB_OFFSET = "q"
+
+
+class StringTable():
+    """
+    Read-only sequence of strings stored as an offsets array and a UTF-8 blob.
+    """
+    def __init__(self, offsets, blob):
+        self.offsets = offsets
+        self.blob = blob
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def raw(self, i):
+        return bytes(self.blob[self.offsets[i]:self.offsets[i + 1]])
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        return self.raw(i).decode("utf-8")
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+
+class SortedIndex():
+    """
+    Maps strings to row numbers by binary search over a sorted permutation,
+    so looking up an ID needs no dict built at load time.
+    """
+    def __init__(self, keys, order):
+        self.keys = keys
+        self.order = order
+
+    def __len__(self):
+        return len(self.order)
+
+    def key(self, k):
+        return self.keys.raw(self.order[k])
+
+    def first(self, value):
+        """Returns the first position in order whose key is >= value."""
+        lo, hi = 0, len(self.order)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.key(mid) < value:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def rows(self, key):
+        """Returns every row whose key equals `key`."""
+        value = key.encode("utf-8")
+        k = self.first(value)
+        rows = []
+        while k < len(self.order) and self.key(k) == value:
+            rows.append(self.order[k])
+            k += 1
+        return rows
+
+    def get(self, key, default=None):
+        rows = self.rows(key)
+        return rows[0] if rows else default
+
+    def __getitem__(self, key):
+        rows = self.rows(key)
+        if not rows:
+            raise KeyError(key)
+        return rows[0]
+
+    def __contains__(self, key):
+        return bool(self.rows(key))
+
+
+class LoweredNames():
+    """
+    Keys for a SortedIndex over in-memory names: each name is lowercased
+    and encoded when the binary search looks at it, so no second copy
+    of every name is kept.
+    """
+    def __init__(self, person_names):
+        self.person_names = person_names
+
+    def raw(self, i):
+        return self.person_names[i].lower().encode("utf-8")
+
+
+class NameIndex():
+    """
+    Stand-in for the `names` dict of degrees.py backed by a snapshot:
+    maps a lowercased name to the set of person_ids with that name.
+    """
+    def __init__(self, index, person_ids):
+        self.index = index
+        self.person_ids = person_ids
+
+    def get(self, name, default=None):
+        rows = self.index.rows(name)
+        if not rows:
+            return default
+        return {self.person_ids[row] for row in rows}
+
+    def __getitem__(self, name):
+        person_ids = self.get(name)
+        if person_ids is None:
+            raise KeyError(name)
+        return person_ids
+
+    def __contains__(self, name):
+        return bool(self.index.rows(name))
+
+
+def name_index(person_names, person_ids):
+    """
+    NameIndex over in-memory name and ID lists, for the csr backend: one
+    sorted array of row numbers instead of a dict and a set per person.
+    """
+    order = sorted_order([name.lower() for name in person_names])
+    return NameIndex(SortedIndex(LoweredNames(person_names), order), person_ids)
+
+
+def snapshot_path(directory):
+    return os.path.join(directory, FILENAME)
+
+
+def is_stale(directory, path=None):
+    """
+    True if the snapshot is missing, older than any of the source CSVs,
+    or written in an older snapshot format.
+    """
+    path = path or snapshot_path(directory)
+    try:
+        built = os.path.getmtime(path)
+        with open(path, "rb") as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                return True
+    except OSError:
+        return True
+    return any(
+        os.path.getmtime(os.path.join(directory, name)) > built
+        for name in SOURCES
+    )
+
+
+def sorted_order(strings):
+    """Row numbers of strings, sorted by their UTF-8 bytes."""
+    encoded = [s.encode("utf-8") for s in strings]
+    return array(INDEX, sorted(range(len(encoded)), key=encoded.__getitem__))
+
+
+def string_sections(name, strings):
+    """Encodes a list of strings as (offsets, blob) sections."""
+    offsets = array(BLOB_OFFSET, [0])
+    blob = bytearray()
+    for s in strings:
+        blob += s.encode("utf-8")
+        offsets.append(len(blob))
+    return [(f"{name}.off", offsets), (f"{name}.str", bytes(blob))]
+
+
+def write_snapshot(graph, path):
+    """
+    Writes graph to path. The file is written next to path and renamed
+    into place, so readers never map a half-written snapshot.
+    """
+    if graph.changed():
+        graph = graph.compact()
+    lowered = [name.lower() for name in graph.person_names]
+    sections = [
+        ("person_offsets", graph.person_offsets),
+        ("person_movies", graph.person_movies),
+        ("movie_offsets", graph.movie_offsets),
+        ("movie_people", graph.movie_people),
+        ("person_births", graph.person_births),
+        ("movie_years", graph.movie_years),
+        ("person_order", sorted_order(graph.person_ids)),
+        ("movie_order", sorted_order(graph.movie_ids)),
+        ("name_order", sorted_order(lowered)),
+        ("components", graph.components().labels),
+    ]
+    sections += string_sections("person_ids", graph.person_ids)
+    sections += string_sections("person_names", graph.person_names)
+    sections += string_sections("movie_ids", graph.movie_ids)
+    sections += string_sections("movie_titles", graph.movie_titles)
+    sections += string_sections("names", lowered)
+
+    # lay out the sections after the header and section table
+    offset = align(HEADER.size + SECTION.size * len(sections))
+    table = []
+    for name, data in sections:
+        if isinstance(data, array):
+            typecode, payload = data.typecode, array(data.typecode, data).tobytes()
+        else:
+            typecode, payload = "B", bytes(data)
+        table.append((name, typecode, offset, payload))
+        offset = align(offset + len(payload))
+
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(HEADER.pack(MAGIC, sys.byteorder.encode(), len(table)))
+        for name, typecode, offset, payload in table:
+            f.write(SECTION.pack(name.encode(), typecode.encode(), offset, len(payload)))
+        for name, typecode, offset, payload in table:
+            f.write(b"\0" * (offset - f.tell()))
+            f.write(payload)
+    os.replace(tmp, path)
+
+
+def read_snapshot(path):
+    """
+    Memory-maps a snapshot and returns a Graph whose arrays are views
+    straight into the mapped file.
+    """
+    with open(path, "rb") as f:
+        buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    magic, byteorder, count = HEADER.unpack_from(buffer, 0)
+    if magic != MAGIC:
+        raise ValueError(f"{path} is not a degrees snapshot")
+    if byteorder.rstrip(b"\0").decode() != sys.byteorder:
+        raise ValueError(f"{path} was written on a machine with another byte order")
+
+    view = memoryview(buffer)
+    sections = {}
+    for i in range(count):
+        name, typecode, offset, length = SECTION.unpack_from(
+            buffer, HEADER.size + i * SECTION.size
+        )
+        data = view[offset:offset + length]
+        typecode = typecode.decode()
+        sections[name.rstrip(b"\0").decode()] = (
+            data if typecode == "B" else data.cast(typecode)
+        )
+
+    def strings(name):
+        return StringTable(sections[f"{name}.off"], sections[f"{name}.str"])
+
+    person_ids = strings("person_ids")
+    movie_ids = strings("movie_ids")
+    graph = Graph(
+        person_ids, strings("person_names"), sections["person_births"],
+        movie_ids, strings("movie_titles"), sections["movie_years"],
+        sections["person_offsets"], sections["person_movies"],
+        sections["movie_offsets"], sections["movie_people"],
+        person_index=SortedIndex(person_ids, sections["person_order"]),
+        movie_index=SortedIndex(movie_ids, sections["movie_order"]),
+        component_labels=sections["components"],
+    )
+    graph.names = NameIndex(
+        SortedIndex(strings("names"), sections["name_order"]), person_ids
+    )
+    return graph
+
+
+def load_snapshot(directory, path=None, progress=None, processes=None):
+    """
+    Maps the snapshot for a dataset directory, compiling it first
+    if it is missing or older than the CSVs.
+    """
+    path = path or snapshot_path(directory)
+    if is_stale(directory, path):
+        graph = Graph.from_csv(directory, progress=progress, processes=processes)
+        write_snapshot(graph, path)
+    return read_snapshot(path)
+
+
+def align(offset):
+    return (offset + ALIGN - 1) // ALIGN * ALIGN
+
+
+def main():
+    if len(sys.argv) > 2:
+        sys.exit("Usage: python snapshot.py [directory]")
+    directory = sys.argv[1] if len(sys.argv) == 2 else "large"
+
+    print("Compiling snapshot...")
+    path = snapshot_path(directory)
+    graph = Graph.from_csv(directory, progress=ProgressReporter(),
+                           processes=default_processes())
+    write_snapshot(graph, path)
+    print(f"Wrote {path}.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+import os
+import random
+import tempfile
+
+import batch
+import degrees
+import delta
+import landmarks
+from util import BUDGET_EXCEEDED, FOUND
+
+
+def is_path(source, target, path):
+    """Checks that path is a chain of shared movies from source to target."""
+    person = source
+    for movie, next_person in path:
+        if (movie, next_person) not in degrees.neighbors_for_person(person):
+            return False
+        person = next_person
+    return person == target
+
+
+# every engine finds a shortest path, of the same length, on every backend
+for backend in ["dict", "csr", "snapshot"]:
+    degrees.load_data("small", backend)
+    engines = [engine for engine in degrees.ENGINES
+               if engine != "csr" or degrees.graph is not None]
+    person_ids = sorted(degrees.people) if degrees.graph is None else sorted(degrees.graph.person_ids)
+    for source in person_ids:
+        for target in person_ids:
+            paths = [degrees.shortest_path(source, target, engine) for engine in engines]
+            if paths[0] is None:
+                assert all(path is None for path in paths), (backend, source, target)
+                assert degrees.count_shortest_paths(source, target) == 0
+                assert degrees.search(source, target).status != FOUND
+                continue
+            length = len(paths[0])
+            for engine, path in zip(engines, paths):
+                assert len(path) == length, (backend, engine, source, target)
+                assert is_path(source, target, path), (backend, engine, source, target)
+
+            # every shortest path, and as many as counted
+            every = list(degrees.all_shortest_paths(source, target))
+            assert len(every) == degrees.count_shortest_paths(source, target)
+            assert all(len(path) == length and is_path(source, target, path) for path in every)
+
+            # one degree short of the shortest path runs out of budget
+            assert degrees.search(source, target, max_degrees=length).status == FOUND
+            if length > 0:
+                result = degrees.search(source, target, max_degrees=length - 1)
+                assert result.status == BUDGET_EXCEEDED, (backend, source, target)
+                for engine in degrees.BUDGETED_ENGINES:
+                    if engine in engines:
+                        assert degrees.shortest_path(source, target, engine,
+                                                     max_degrees=length - 1) is None
+    print(f"{', '.join(engines)} engines agree on shortest paths ({backend} backend)")
+
+# landmark bounds: the NumPy branch of many_bounds must agree with bounds_for
+if landmarks.numpy is None:
+    print("skipped many_bounds: NumPy is not installed")
+else:
+    for backend in ["dict", "csr"]:
+        degrees.load_data("small", backend)
+        index = degrees.build_landmarks(k=4)
+        graph = index.graph
+        rng = random.Random(50)
+        person_ids = [graph.person_ids[p] for p in graph.people()]
+        pairs = [(rng.choice(person_ids), rng.choice(person_ids)) for _ in range(500)]
+        pairs += [(person_id, person_id) for person_id in person_ids[:5]]
+
+        expected = [index.bounds(source, target) for source, target in pairs]
+        assert index.many_bounds(pairs) == expected
+        assert index.many_bounds([]) == []
+
+        # every bound brackets the true distance
+        for (source, target), bounds in list(zip(pairs, expected))[:50]:
+            path = degrees.shortest_path(source, target)
+            if path is None or bounds is None:
+                continue
+            lower, upper = bounds
+            assert lower <= len(path) <= upper, (source, target, bounds, len(path))
+        print(f"many_bounds agrees with bounds_for on {len(pairs)} pairs ({backend} backend)")
+
+# a connected pair in a component no landmark reaches still gets bounds
+for backend in ["dict", "csr"]:
+    degrees.load_data("small", backend)
+    delta.apply_changes(add_people=[("4", "Four", ""), ("5", "Five", "")],
+                        add_movies=[("12", "Twelve", "")],
+                        add_stars=[("4", "12"), ("5", "12")])
+    degrees.build_landmarks(k=1)
+    assert degrees.connected("4", "5")
+    assert degrees.landmark_index.bounds("4", "5") is None
+    assert degrees.approximate_degrees("4", "5") == (1, 1)
+    assert degrees.approximate_degrees("4", "102") is None
+print("approximate_degrees bounds connected pairs without a landmark")
+
+# a saved landmark index loads back only for the data it was built from
+with tempfile.TemporaryDirectory() as tmp:
+    path = os.path.join(tmp, "landmarks")
+    degrees.load_data("small", "csr")
+    built = degrees.build_landmarks(k=2, path=path)
+    loaded = degrees.build_landmarks(k=2, path=path)
+    assert (loaded.landmarks, loaded.table) == (built.landmarks, built.table)
+    delta.apply_changes(add_people=[("4", "Four", "")], add_movies=[("12", "Twelve", "")],
+                        add_stars=[("4", "12"), ("102", "12")])
+    rebuilt = degrees.build_landmarks(k=2, path=path)
+    resaved = landmarks.LandmarkIndex.load(rebuilt.graph, path, degrees.data_fingerprint)
+    assert resaved.table == rebuilt.table
+    assert degrees.approximate_degrees("4", "102") == (1, 1)
+print("landmark index saved and rebuilt when the data changes")
+
+# a batch of changes reads the same on every backend, before and after compacting
+changes = dict(
+    add_people=[("1", "Alice Ames", "1970"), ("2", "Tom Hanks", "1980"),
+                ("129", "Thomas Cruise", "1962")],
+    add_movies=[("10", "New Movie", "2020")],
+    add_stars=[("1", "10"), ("2", "10"), ("914612", "10"), ("1", "109830"),
+               ("1", "93779")],
+    remove_people=["163"],
+    remove_movies=["95953"],
+    remove_stars=[("102", "112384"), ("705", "93779")],
+)
+lookups = ["Alice Ames", "Tom Hanks", "Tom Cruise", "Thomas Cruise", "Dustin Hoffman"]
+
+
+def changed_state():
+    if degrees.graph is None:
+        person_ids = sorted(degrees.people)
+    else:
+        person_ids = sorted(degrees.graph.person_ids[p] for p in degrees.graph.people())
+    paths = {}
+    for source in person_ids:
+        for target in person_ids:
+            path = degrees.shortest_path(source, target)
+            paths[source, target] = None if path is None else len(path)
+    return {
+        "people": person_ids,
+        "components": degrees.component_stats(),
+        "names": {name: sorted(degrees.person_ids_for_name(name)) for name in lookups},
+        "neighbors": {p: sorted(degrees.neighbors_for_person(p)) for p in person_ids},
+        "paths": paths,
+    }
+
+
+states = {}
+for backend in ["dict", "csr", "snapshot"]:
+    degrees.load_data("small", backend)
+    delta.apply_changes(**changes)
+    states[backend] = changed_state()
+    if backend != "dict":
+        delta.compact()
+        assert not degrees.graph.changed()
+        states[f"{backend} compacted"] = changed_state()
+expected = states["dict"]
+assert "163" not in expected["people"] and "1" in expected["people"]
+assert expected["names"]["Tom Hanks"] == ["158", "2"]
+assert expected["names"]["Tom Cruise"] == [] and expected["names"]["Dustin Hoffman"] == []
+for backend, state in states.items():
+    for key in expected:
+        assert state[key] == expected[key], (backend, key)
+print(f"changes agree across {', '.join(states)}")
+
+# batches answer each pair before reading the next, and repeated sources agree
+degrees.load_data("small")
+consumed = []
+
+
+def pairs():
+    for pair in [("Kevin Bacon", "Tom Hanks"), ("Kevin Bacon", "Tom Cruise"),
+                 ("102", "Emma Watson"), ("nobody", "102"), ("kevin bacon", "158")]:
+        consumed.append(pair)
+        yield pair
+
+
+for i, result in enumerate(batch.run_batch(pairs())):
+    assert len(consumed) == i + 1
+    if "error" in result:
+        assert result == {"source": "nobody", "target": "102",
+                          "error": "not found", "name": "nobody"}
+        continue
+    path = degrees.shortest_path(result["source_id"], result["target_id"])
+    assert result["degrees"] == (None if path is None else len(path)), result
+print("run_batch streams its pairs")
@@ -1,3 +1,7 @@
+import time
+from collections import deque
+
+
 class Node():
     def __init__(self, state, parent, action):
         self.state = state
@@ -36,3 +40,129 @@ class QueueFrontier(StackFrontier):
             node = self.frontier[0]
             self.frontier = self.frontier[1:]
             return node
+
+
+class DequeStackFrontier():
+    """
+    StackFrontier with O(1) add, remove and contains_state.
+
+    Nodes live in a deque and their states are counted in a dict, so
+    membership checks don't have to scan the frontier.
+    """
+    def __init__(self):
+        self.frontier = deque()
+        self.states = {}
+
+    def add(self, node):
+        self.frontier.append(node)
+        self.states[node.state] = self.states.get(node.state, 0) + 1
+
+    def contains_state(self, state):
+        return state in self.states
+
+    def empty(self):
+        return len(self.frontier) == 0
+
+    def remove(self):
+        if self.empty():
+            raise Exception("empty frontier")
+        else:
+            node = self.frontier.pop()
+            self.forget(node.state)
+            return node
+
+    def forget(self, state):
+        count = self.states[state] - 1
+        if count:
+            self.states[state] = count
+        else:
+            del self.states[state]
+
+
+class DequeQueueFrontier(DequeStackFrontier):
+
+    def remove(self):
+        if self.empty():
+            raise Exception("empty frontier")
+        else:
+            node = self.frontier.popleft()
+            self.forget(node.state)
+            return node
+
+
+class ExploredSet():
+    """
+    Explored nodes in the order they were explored, with a set of their
+    states for O(1) contains_state.
+    """
+    def __init__(self):
+        self.nodes = []
+        self.states = set()
+
+    def add(self, node):
+        self.nodes.append(node)
+        self.states.add(node.state)
+
+    def contains_state(self, state):
+        return state in self.states
+
+    def __len__(self):
+        return len(self.nodes)
+
+
+# outcomes of a budgeted search
+FOUND = "found"
+NOT_CONNECTED = "not connected"
+BUDGET_EXCEEDED = "budget exceeded"
+
+
+class Budget():
+    """
+    Limits on one search: how many degrees deep it may go, how many people
+    it may expand, and how many seconds it may run. None means unlimited.
+    """
+    def __init__(self, max_degrees=None, max_expansions=None, timeout=None):
+        self.max_degrees = max_degrees
+        self.max_expansions = max_expansions
+        self.deadline = None if timeout is None else time.perf_counter() + timeout
+        self.expanded = 0
+        self.exceeded = None
+
+    def allows_depth(self, degrees):
+        """True if paths of `degrees` hops may still be searched."""
+        if self.max_degrees is not None and degrees > self.max_degrees:
+            self.exceeded = "max_degrees"
+            return False
+        return True
+
+    def expand(self):
+        """Charges one expansion, False once a budget has run out."""
+        if self.max_expansions is not None and self.expanded >= self.max_expansions:
+            self.exceeded = "max_expansions"
+            return False
+        if self.deadline is not None and time.perf_counter() > self.deadline:
+            self.exceeded = "timeout"
+            return False
+        self.expanded += 1
+        return True
+
+
+class SearchResult():
+    """
+    Outcome of a budgeted search: a status (FOUND, NOT_CONNECTED or
+    BUDGET_EXCEEDED), the path if found, how many people were expanded,
+    and which budget ran out if any.
+    """
+    def __init__(self, status, path=None, expanded=0, exceeded=None):
+        self.status = status
+        self.path = path
+        self.expanded = expanded
+        self.exceeded = exceeded
+
+    def __repr__(self):
+        return (f"SearchResult({self.status!r}, path={self.path!r}, "
+                f"expanded={self.expanded}, exceeded={self.exceeded!r})")
+
+    def as_dict(self):
+        return {"status": self.status, "path": self.path,
+                "expanded": self.expanded, "exceeded": self.exceeded}
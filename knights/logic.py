@@ -1,7 +1,54 @@
+import functools
 import itertools
+import weakref
 
+from sat import Solver
 
-class Sentence():
+# number of compiled sentences kept for reuse
+COMPILE_CACHE = 256
+
+# deeper sentences are compiled in pieces of at most this many levels:
+# CPython's parser allows 200 nested parentheses, and a level adds up to 2
+COMPILE_DEPTH = 40
+
+# model_check switches from truth tables to the SAT solver above this
+# many symbols
+SAT_THRESHOLD = 16
+
+# truth tables evaluate this many symbols' worth of models (2^CHUNK_BITS)
+# per bitwise operation
+CHUNK_BITS = 16
+
+# while True, constructing a sentence returns the one shared object for
+# its structure (see set_interning)
+interning = False
+
+# (class, arguments) -> interned sentence
+interned_sentences = weakref.WeakValueDictionary()
+
+# sentence class -> its interned subclass
+interned_classes = {}
+
+
+class SentenceType(type):
+    """Metaclass routing sentence construction through the intern table."""
+
+    def __call__(cls, *args):
+        if not interning or issubclass(cls, Interned):
+            return super().__call__(*args)
+        args = tuple(
+            intern_sentence(arg) if isinstance(arg, Sentence) else arg
+            for arg in args
+        )
+        key = (cls, args)
+        sentence = interned_sentences.get(key)
+        if sentence is None:
+            sentence = interned_class(cls)(*args)
+            interned_sentences[key] = sentence
+        return sentence
+
+
+class Sentence(metaclass=SentenceType):
 
     def evaluate(self, model):
         """Evaluates the logical sentence."""
@@ -15,6 +62,43 @@ class Sentence():
         """Returns a set of all symbols in the logical sentence."""
         return set()
 
+    def arguments(self):
+        """Returns the arguments the sentence was constructed from."""
+        return ()
+
+    def expression(self, index):
+        """
+        Returns a Python expression evaluating the sentence over `m`, a
+        sequence of truth values where symbol name s is at m[index[s]].
+        `index` is an ExpressionIndex, whose operand() gives subterms.
+        """
+        raise Exception("nothing to compile")
+
+    def encode(self, cnf):
+        """
+        Adds clauses to a CNF defining a literal equivalent to the
+        sentence, and returns that literal. Use cnf.literal(sentence),
+        which reuses the literal of an identical subterm.
+        """
+        raise Exception("nothing to encode")
+
+    def column(self, table):
+        """
+        Returns the sentence's column of a TruthTable: its truth value in
+        every model at once. Use table.column(sentence), which reuses the
+        column of an identical subterm.
+        """
+        raise Exception("nothing to tabulate")
+
+    def to_cnf(self, cnf=None):
+        """
+        Returns a CNF (new, or the one given) asserting the sentence.
+        """
+        if cnf is None:
+            cnf = CNF()
+        cnf.add(self)
+        return cnf
+
     @classmethod
     def validate(cls, sentence):
         if not isinstance(sentence, Sentence):
@@ -56,6 +140,9 @@ class Symbol(Sentence):
     def __repr__(self):
         return self.name
 
+    def arguments(self):
+        return (self.name,)
+
     def evaluate(self, model):
         try:
             return bool(model[self.name])
@@ -68,6 +155,18 @@ class Symbol(Sentence):
     def symbols(self):
         return {self.name}
 
+    def expression(self, index):
+        try:
+            return f"m[{index[self.name]}]"
+        except KeyError:
+            raise Exception(f"variable {self.name} not in model")
+
+    def encode(self, cnf):
+        return cnf.symbol(self.name)
+
+    def column(self, table):
+        return table.symbol(self.name)
+
 
 class Not(Sentence):
     def __init__(self, operand):
@@ -83,6 +182,9 @@ class Not(Sentence):
     def __repr__(self):
         return f"Not({self.operand})"
 
+    def arguments(self):
+        return (self.operand,)
+
     def evaluate(self, model):
         return not self.operand.evaluate(model)
 
@@ -92,6 +194,15 @@ class Not(Sentence):
     def symbols(self):
         return self.operand.symbols()
 
+    def expression(self, index):
+        return f"(not {index.operand(self.operand)})"
+
+    def encode(self, cnf):
+        return -cnf.literal(self.operand)
+
+    def column(self, table):
+        return table.negate(table.column(self.operand))
+
 
 class And(Sentence):
     def __init__(self, *conjuncts):
@@ -117,6 +228,9 @@ class And(Sentence):
         Sentence.validate(conjunct)
         self.conjuncts.append(conjunct)
 
+    def arguments(self):
+        return tuple(self.conjuncts)
+
     def evaluate(self, model):
         return all(conjunct.evaluate(model) for conjunct in self.conjuncts)
 
@@ -129,6 +243,31 @@ class And(Sentence):
     def symbols(self):
         return set.union(*[conjunct.symbols() for conjunct in self.conjuncts])
 
+    def expression(self, index):
+        if not self.conjuncts:
+            return "True"
+        return "(" + " and ".join(
+            index.operand(conjunct) for conjunct in self.conjuncts
+        ) + ")"
+
+    def encode(self, cnf):
+        if len(self.conjuncts) == 1:
+            return cnf.literal(self.conjuncts[0])
+        conjuncts = [cnf.literal(conjunct) for conjunct in self.conjuncts]
+        x = cnf.new_variable()
+        for conjunct in conjuncts:
+            cnf.add_clause([-x, conjunct])
+        cnf.add_clause([x] + [-conjunct for conjunct in conjuncts])
+        return x
+
+    def column(self, table):
+        column = table.true
+        for conjunct in self.conjuncts:
+            column = column & table.column(conjunct)
+            if not column:
+                break
+        return column
+
 
 class Or(Sentence):
     def __init__(self, *disjuncts):
@@ -148,6 +287,9 @@ class Or(Sentence):
         disjuncts = ", ".join([str(disjunct) for disjunct in self.disjuncts])
         return f"Or({disjuncts})"
 
+    def arguments(self):
+        return tuple(self.disjuncts)
+
     def evaluate(self, model):
         return any(disjunct.evaluate(model) for disjunct in self.disjuncts)
 
@@ -160,6 +302,31 @@ class Or(Sentence):
     def symbols(self):
         return set.union(*[disjunct.symbols() for disjunct in self.disjuncts])
 
+    def expression(self, index):
+        if not self.disjuncts:
+            return "False"
+        return "(" + " or ".join(
+            index.operand(disjunct) for disjunct in self.disjuncts
+        ) + ")"
+
+    def encode(self, cnf):
+        if len(self.disjuncts) == 1:
+            return cnf.literal(self.disjuncts[0])
+        disjuncts = [cnf.literal(disjunct) for disjunct in self.disjuncts]
+        x = cnf.new_variable()
+        for disjunct in disjuncts:
+            cnf.add_clause([x, -disjunct])
+        cnf.add_clause([-x] + disjuncts)
+        return x
+
+    def column(self, table):
+        column = table.false
+        for disjunct in self.disjuncts:
+            column = column | table.column(disjunct)
+            if column == table.true:
+                break
+        return column
+
 
 class Implication(Sentence):
     def __init__(self, antecedent, consequent):
@@ -179,6 +346,9 @@ class Implication(Sentence):
     def __repr__(self):
         return f"Implication({self.antecedent}, {self.consequent})"
 
+    def arguments(self):
+        return (self.antecedent, self.consequent)
+
     def evaluate(self, model):
         return ((not self.antecedent.evaluate(model))
                 or self.consequent.evaluate(model))
@@ -191,6 +361,24 @@ class Implication(Sentence):
     def symbols(self):
         return set.union(self.antecedent.symbols(), self.consequent.symbols())
 
+    def expression(self, index):
+        antecedent = index.operand(self.antecedent)
+        consequent = index.operand(self.consequent)
+        return f"((not {antecedent}) or {consequent})"
+
+    def encode(self, cnf):
+        antecedent = cnf.literal(self.antecedent)
+        consequent = cnf.literal(self.consequent)
+        x = cnf.new_variable()
+        cnf.add_clause([-x, -antecedent, consequent])
+        cnf.add_clause([x, antecedent])
+        cnf.add_clause([x, -consequent])
+        return x
+
+    def column(self, table):
+        return (table.negate(table.column(self.antecedent))
+                | table.column(self.consequent))
+
 
 class Biconditional(Sentence):
     def __init__(self, left, right):
@@ -210,6 +398,9 @@ class Biconditional(Sentence):
     def __repr__(self):
         return f"Biconditional({self.left}, {self.right})"
 
+    def arguments(self):
+        return (self.left, self.right)
+
     def evaluate(self, model):
         return ((self.left.evaluate(model)
                  and self.right.evaluate(model))
@@ -224,10 +415,534 @@ class Biconditional(Sentence):
     def symbols(self):
         return set.union(self.left.symbols(), self.right.symbols())
 
+    def expression(self, index):
+        left = index.operand(self.left)
+        right = index.operand(self.right)
+        return f"(bool({left}) == bool({right}))"
+
+    def encode(self, cnf):
+        left = cnf.literal(self.left)
+        right = cnf.literal(self.right)
+        x = cnf.new_variable()
+        cnf.add_clause([-x, -left, right])
+        cnf.add_clause([-x, left, -right])
+        cnf.add_clause([x, left, right])
+        cnf.add_clause([x, -left, -right])
+        return x
+
+    def column(self, table):
+        return table.negate(table.column(self.left) ^ table.column(self.right))
+
+
+class Interned():
+    """
+    Mixin for interned sentences. There is one object per structure and
+    it never changes, so equality is usually identity, the hash and
+    symbols are computed once, and evaluating on a Model remembers the
+    result. Copies are the sentence itself, and unpickling interns again.
+    """
+
+    def __eq__(self, other):
+        return self is other or super().__eq__(other)
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def __reduce__(self):
+        # the Interned classes are made at runtime, so pickle the class
+        # they intern and build through the table again
+        return construct_interned, (type(self).__mro__[2], self.arguments())
+
+    def __hash__(self):
+        try:
+            return self.hash_value
+        except AttributeError:
+            self.hash_value = super().__hash__()
+            return self.hash_value
+
+    def symbols(self):
+        try:
+            return set(self.symbol_set)
+        except AttributeError:
+            self.symbol_set = frozenset(super().symbols())
+            return set(self.symbol_set)
+
+    def evaluate(self, model):
+        if not isinstance(model, Model):
+            return super().evaluate(model)
+        # keyed on the sentence itself, which hashes once and compares by
+        # identity; an id() could be reused once a sentence is collected
+        memo = model.memo
+        try:
+            return memo[self]
+        except KeyError:
+            value = memo[self] = super().evaluate(model)
+            return value
+
+    def add(self, sentence):
+        raise TypeError("interned sentences can't be changed")
+
+
+class Model(dict):
+    """
+    Symbol name to truth value. Interned sentences evaluated on a Model
+    memoize their value in it, so a subterm shared across the tree is
+    evaluated once per model. Any change to the symbols forgets those
+    values; dict's own mutators don't go through __setitem__, so each
+    one is overridden.
+    """
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.memo = {}
+
+    def __setitem__(self, key, value):
+        self.memo.clear()
+        super().__setitem__(key, value)
+
+    def __delitem__(self, key):
+        self.memo.clear()
+        super().__delitem__(key)
+
+    def __ior__(self, other):
+        self.memo.clear()
+        return super().__ior__(other)
+
+    def update(self, *args, **kwargs):
+        self.memo.clear()
+        super().update(*args, **kwargs)
+
+    def setdefault(self, key, default=None):
+        self.memo.clear()
+        return super().setdefault(key, default)
+
+    def pop(self, *args):
+        self.memo.clear()
+        return super().pop(*args)
+
+    def popitem(self):
+        self.memo.clear()
+        return super().popitem()
+
+    def clear(self):
+        self.memo.clear()
+        super().clear()
+
+    def copy(self):
+        return Model(self)
+
+
+def interned_class(cls):
+    if cls not in interned_classes:
+        # looking a symbol up in the model is already as cheap as the memo
+        namespace = {"evaluate": cls.evaluate} if issubclass(cls, Symbol) else {}
+        interned_classes[cls] = type(f"Interned{cls.__name__}", (Interned, cls),
+                                     namespace)
+    return interned_classes[cls]
+
+
+def intern_sentence(sentence):
+    """Returns the interned sentence structurally equal to sentence."""
+    if isinstance(sentence, Interned):
+        return sentence
+    return construct_interned(type(sentence), sentence.arguments())
+
+
+def construct_interned(cls, arguments):
+    """Returns the interned cls(*arguments), whether interning is on or not."""
+    global interning
+    enabled, interning = interning, True
+    try:
+        return cls(*arguments)
+    finally:
+        interning = enabled
+
+
+def set_interning(enabled):
+    """
+    Turns interning on or off. While on, structurally equal sentences are
+    the same object: And(A, B) is And(A, B). Sentences made before still
+    work; they are interned when used to build new ones.
+    """
+    global interning
+    interning = enabled
+
+
+class ExpressionIndex(dict):
+    """
+    Symbol name to position in the model tuple, passed to expression().
+    Subterms a deep sentence was split at (see compile_sentence) map,
+    by id, to a call of the helper function compiled for them.
+    """
+    def __init__(self, symbols):
+        super().__init__((symbol, i) for i, symbol in enumerate(symbols))
+        self.calls = {}
+
+    def operand(self, sentence):
+        """Expression of a subterm, or the call to its helper function."""
+        call = self.calls.get(id(sentence))
+        return sentence.expression(self) if call is None else call
+
+
+def compile_sentence(sentence, symbols):
+    """
+    Compiles a sentence into one flat function of a tuple of truth values,
+    the i-th being the value of symbols[i].
+
+    The tree becomes a single Python expression, so evaluating a model
+    involves no recursion, method dispatch or dict lookups. Trees deeper
+    than COMPILE_DEPTH are cut into pieces that deep, each compiled into
+    a helper function the piece above calls.
+    """
+    index = ExpressionIndex(symbols)
+    helpers = ()
+    for subterm in split_points(sentence):
+        helpers += (compile_expression(subterm.expression(index), helpers),)
+        index.calls[id(subterm)] = f"h[{len(helpers) - 1}](m)"
+    return compile_expression(sentence.expression(index), helpers)
+
+
+def split_points(sentence):
+    """
+    Subterms to compile separately, innermost first: every subterm
+    COMPILE_DEPTH levels above the leaves or the split points below it.
+    Walks the tree with an explicit stack, so depth is no concern.
+    """
+    height = {}
+    splits = []
+    stack = [(sentence, False)]
+    while stack:
+        node, expanded = stack.pop()
+        if id(node) in height:
+            continue
+        operands = [arg for arg in node.arguments() if isinstance(arg, Sentence)]
+        if not expanded:
+            stack.append((node, True))
+            stack.extend((operand, False) for operand in operands
+                         if id(operand) not in height)
+            continue
+        height[id(node)] = 1 + max((height[id(operand)] for operand in operands),
+                                   default=0)
+        if height[id(node)] >= COMPILE_DEPTH and node is not sentence:
+            splits.append(node)
+            height[id(node)] = 0
+    return splits
+
+
+@functools.lru_cache(maxsize=COMPILE_CACHE)
+def compile_expression(expression, helpers=()):
+    # keyed on the generated source, so repeated queries against the same
+    # knowledge base (and in-place changes to it) are handled correctly;
+    # helpers come from this cache too, so equal sources share them
+    return eval(f"lambda m: {expression}", {"h": helpers})
+
 
 def model_check(knowledge, query):
     """Checks if knowledge base entails query."""
 
+    # Get all symbols in both knowledge and query
+    symbols = sorted(set.union(knowledge.symbols(), query.symbols()))
+    if len(symbols) > SAT_THRESHOLD:
+        return sat_check(knowledge, query, symbols)
+    return TruthTable(symbols).entails(knowledge, query)
+
+
+def compiled_check(knowledge, query):
+    """
+    Checks if knowledge base entails query by running compiled sentences
+    on one model at a time.
+    """
+
+    # Get all symbols in both knowledge and query
+    symbols = sorted(set.union(knowledge.symbols(), query.symbols()))
+
+    # Compile both sentences once, then try every model
+    knowledge_holds = compile_sentence(knowledge, symbols)
+    query_holds = compile_sentence(query, symbols)
+    for model in itertools.product((True, False), repeat=len(symbols)):
+
+        # If knowledge base is true in model, then query must also be true
+        if knowledge_holds(model) and not query_holds(model):
+            return False
+    return True
+
+
+class TruthTable():
+    """
+    The truth table over `symbols`, evaluated a chunk of models at a time.
+
+    Model number m gives symbols[i] the value of bit i of m. A column is a
+    Python int holding a sentence's value in every model of the current
+    chunk, one bit per model, so each node of a sentence costs a single
+    bitwise operation over up to 2^chunk_bits models. Symbols past the
+    first chunk_bits are constant within a chunk, which keeps memory flat
+    however many symbols there are.
+    """
+    def __init__(self, symbols, chunk_bits=CHUNK_BITS):
+        self.symbols = list(symbols)
+        self.index = {symbol: i for i, symbol in enumerate(self.symbols)}
+        self.low = min(len(self.symbols), chunk_bits)
+        self.size = 1 << self.low
+        self.chunks = 1 << (len(self.symbols) - self.low)
+        self.true = (1 << self.size) - 1
+        self.false = 0
+        self.patterns = [self.pattern(i) for i in range(self.low)]
+        self.chunk = 0
+        self.columns = {}
+
+    def __len__(self):
+        return self.size * self.chunks
+
+    def pattern(self, i):
+        # 2^i zeros then 2^i ones, doubled until it covers the chunk
+        column = ((1 << (1 << i)) - 1) << (1 << i)
+        length = 1 << (i + 1)
+        while length < self.size:
+            column |= column << length
+            length *= 2
+        return column
+
+    def symbol(self, name):
+        """Column of a symbol: true exactly in models with its bit set."""
+        try:
+            i = self.index[name]
+        except KeyError:
+            raise Exception(f"variable {name} not in model")
+        if i < self.low:
+            return self.patterns[i]
+        return self.true if self.chunk >> (i - self.low) & 1 else self.false
+
+    def negate(self, column):
+        return self.true ^ column
+
+    def column(self, sentence):
+        """
+        Column of a sentence in the current chunk. Each sentence object
+        is evaluated once per chunk, so a shared (or interned) subterm
+        costs one operation however often it appears.
+        """
+        key = id(sentence)
+        if key not in self.columns:
+            self.columns[key] = (sentence, sentence.column(self))
+        return self.columns[key][1]
+
+    def each_chunk(self, *sentences):
+        """Yields (first model number, columns of sentences) per chunk."""
+        for chunk in range(self.chunks):
+            self.chunk = chunk
+            self.columns = {}
+            yield chunk << self.low, [self.column(sentence) for sentence in sentences]
+        self.columns = {}
+
+    def count(self, sentence):
+        """Number of models in which the sentence is true."""
+        return sum(column.bit_count() for _, (column,) in self.each_chunk(sentence))
+
+    def satisfying(self, sentence):
+        """Numbers of the models in which the sentence is true, in order."""
+        for first, (column,) in self.each_chunk(sentence):
+            while column:
+                low = column & -column
+                yield first + low.bit_length() - 1
+                column ^= low
+
+    def model(self, m):
+        """Model number m as a dict from symbol to truth value."""
+        return {symbol: bool(m >> i & 1) for i, symbol in enumerate(self.symbols)}
+
+    def models_of(self, sentence):
+        """Yields every model of the sentence as a dict."""
+        for m in self.satisfying(sentence):
+            yield self.model(m)
+
+    def entails(self, knowledge, query):
+        """Checks if no model makes knowledge true and query false."""
+        return self.entailed(knowledge, [query])[0]
+
+    def entailed(self, knowledge, queries):
+        """
+        entails for each of many queries, evaluating the knowledge base
+        once per chunk and dropping queries once a counterexample is found.
+        """
+        results = [True] * len(queries)
+        open_queries = list(range(len(queries)))
+        for _ in self.each_chunk():
+            known = self.column(knowledge)
+            if not known:
+                continue
+            for i in list(open_queries):
+                if known & self.negate(self.column(queries[i])):
+                    results[i] = False
+                    open_queries.remove(i)
+            if not open_queries:
+                break
+        self.columns = {}
+        return results
+
+
+class CNF():
+    """
+    Clauses in conjunctive normal form over DIMACS-style integer literals,
+    built with the Tseitin transformation.
+
+    Every compound subterm gets an auxiliary variable defined by a few
+    clauses, so the size is linear in the sentence instead of blowing up
+    the way distributing Or over And does. Identical subterms share one
+    variable. `index` maps symbol names to variables and `names` maps
+    them back.
+    """
+    def __init__(self, symbols=()):
+        self.clauses = []
+        self.variables = 0
+        self.index = {}
+        self.names = {}
+        self.literals = {}
+        for symbol in symbols:
+            self.symbol(symbol)
+
+    def __len__(self):
+        return len(self.clauses)
+
+    def new_variable(self):
+        self.variables += 1
+        return self.variables
+
+    def symbol(self, name):
+        """Variable for a symbol name, allocated on first use."""
+        if name not in self.index:
+            v = self.new_variable()
+            self.index[name] = v
+            self.names[v] = name
+        return self.index[name]
+
+    def add_clause(self, clause):
+        self.clauses.append(clause)
+
+    def literal(self, sentence):
+        """Literal equivalent to a sentence, encoding it the first time."""
+        if sentence not in self.literals:
+            self.literals[sentence] = sentence.encode(self)
+        return self.literals[sentence]
+
+    def add(self, sentence):
+        """
+        Asserts a sentence. Top-level conjunctions and disjunctions of
+        literals become clauses directly, without auxiliary variables.
+        """
+        if isinstance(sentence, And):
+            for conjunct in sentence.conjuncts:
+                self.add(conjunct)
+        elif isinstance(sentence, Or):
+            self.add_clause([self.literal(disjunct) for disjunct in sentence.disjuncts])
+        elif isinstance(sentence, Implication):
+            self.add_clause([-self.literal(sentence.antecedent),
+                             self.literal(sentence.consequent)])
+        else:
+            self.add_clause([self.literal(sentence)])
+
+    def model(self, values):
+        """
+        Symbol name to truth value, from a sequence of variable values
+        (variable v at values[v - 1]).
+        """
+        return {name: values[v - 1] for name, v in self.index.items()}
+
+
+class KnowledgeBase():
+    """
+    Sentences told one at a time, kept as clauses in one SAT solver that
+    lives as long as the knowledge base.
+
+    Each query only adds the Tseitin definition of the query (which any
+    model can satisfy) and solves under the assumption that the query is
+    false. Clauses learned and facts propagated for one query are reused
+    by the next, and every model found is kept: a query a known model
+    already falsifies is answered without solving at all.
+    """
+    def __init__(self, *sentences):
+        self.cnf = CNF()
+        self.solver = Solver()
+        self.added = 0
+        self.models = []
+        for sentence in sentences:
+            self.add(sentence)
+
+    def add(self, sentence):
+        """Adds a sentence to the knowledge base."""
+        Sentence.validate(sentence)
+        self.cnf.add(sentence)
+        self.flush()
+
+        # known models may not satisfy the new sentence
+        self.models = []
+
+    def flush(self):
+        """Passes clauses the CNF gained since the last call to the solver."""
+        for clause in self.cnf.clauses[self.added:]:
+            self.solver.add_clause(clause)
+        self.added = len(self.cnf.clauses)
+
+    def literal(self, sentence):
+        literal = self.cnf.literal(sentence)
+        self.flush()
+        return literal
+
+    def satisfiable(self, assumptions=()):
+        """
+        Whether the knowledge base has a model in which all the sentences
+        in assumptions are true as well.
+        """
+        literals = [self.literal(assumption) for assumption in assumptions]
+        if not self.solver.solve(literals):
+            return False
+        self.models.append(self.cnf.model(self.solver.model))
+        return True
+
+    def entails(self, query, assumptions=()):
+        """
+        Checks if the knowledge base, together with the sentences in
+        assumptions, entails query.
+        """
+        assumptions = list(assumptions)
+        for model in self.models:
+            if self.counterexample(model, query, assumptions):
+                return False
+        return not self.satisfiable(assumptions + [Not(query)])
+
+    def counterexample(self, model, query, assumptions):
+        # sentences over symbols the model predates can't be judged by it
+        for sentence in [query] + assumptions:
+            if not sentence.symbols() <= model.keys():
+                return False
+        return (all(assumption.evaluate(model) for assumption in assumptions)
+                and not query.evaluate(model))
+
+
+def sat_check(knowledge, query, symbols=None):
+    """
+    Checks if knowledge base entails query with the SAT solver: it does
+    exactly when knowledge ∧ ¬query has no model.
+    """
+    if symbols is None:
+        symbols = sorted(set.union(knowledge.symbols(), query.symbols()))
+    cnf = CNF(symbols)
+    cnf.add(knowledge)
+    cnf.add(Not(query))
+    solver = Solver()
+    for clause in cnf.clauses:
+        if not solver.add_clause(clause):
+            return True
+    return not solver.solve()
+
+
+def model_check_recursive(knowledge, query):
+    """
+    Checks if knowledge base entails query by evaluating the sentence
+    trees directly on each model, without compiling them.
+    """
+
     def check_all(knowledge, query, symbols, model):
         """Checks if knowledge base entails query, given a particular model."""
 
@@ -0,0 +1,359 @@
+"""
+Conflict-driven clause learning SAT solver.
+
+Clauses are lists of DIMACS-style literals: variable v (from 1) is the
+literal v, its negation -v. Internally literal v is 2 * (v - 1) and its
+negation 2 * (v - 1) + 1, so negating is `lit ^ 1` and per-literal
+state lives in flat lists.
+
+Each clause watches its first two literals and is only looked at when
+one of them becomes false. Conflicts are analysed back to the first
+unique implication point and the learned clause is kept, branching
+follows VSIDS activity with saved phases, and the search restarts on a
+Luby schedule.
+
+Learned clauses follow from the clauses alone, so they are kept across
+calls to solve, including calls under different assumptions.
+"""
+import heapq
+
+# conflicts between restarts, scaled by the Luby sequence
+RESTART_BASE = 100
+
+# VSIDS activity decay per conflict
+DECAY = 0.95
+
+# rescale activities once any exceeds this
+RESCALE = 1e100
+
+
+def internal(literal):
+    """DIMACS literal to internal literal."""
+    return 2 * (literal - 1) if literal > 0 else 2 * (-literal - 1) + 1
+
+
+def external(lit):
+    """Internal literal to DIMACS literal."""
+    return -((lit >> 1) + 1) if lit & 1 else (lit >> 1) + 1
+
+
+def luby(i):
+    """The i-th term (from 0) of the Luby sequence 1, 1, 2, 1, 1, 2, 4, ..."""
+    size, exponent = 1, 0
+    while size < i + 1:
+        exponent += 1
+        size = 2 * size + 1
+    while size - 1 != i:
+        size = (size - 1) >> 1
+        exponent -= 1
+        i = i % size
+    return 1 << exponent
+
+
+class Solver():
+    """
+    Incremental SAT solver. Add clauses, call solve, read the model;
+    clauses can keep being added between calls.
+    """
+    def __init__(self):
+        self.ok = True
+        self.clauses = []
+        self.learned = []
+
+        # per variable
+        self.level = []
+        self.reason = []
+        self.activity = []
+        self.phase = []
+
+        # per internal literal
+        self.value = []
+        self.watches = []
+
+        self.trail = []
+        self.trail_lim = []
+        self.queue_head = 0
+        self.order = []
+        self.increment = 1.0
+        self.model = None
+        self.conflicts = 0
+        self.decisions = 0
+        self.propagations = 0
+
+    def variables(self):
+        return len(self.level)
+
+    def new_variable(self):
+        """Adds a variable and returns its (positive) DIMACS literal."""
+        v = len(self.level)
+        self.level.append(0)
+        self.reason.append(None)
+        self.activity.append(0.0)
+        self.phase.append(False)
+        self.value.extend((None, None))
+        self.watches.extend(([], []))
+        heapq.heappush(self.order, (0.0, v))
+        return v + 1
+
+    def ensure(self, literal):
+        while abs(literal) > len(self.level):
+            self.new_variable()
+
+    def add_clause(self, literals):
+        """
+        Adds a clause (an iterable of DIMACS literals). Returns False if
+        the clauses are now known to be unsatisfiable.
+        """
+        if not self.ok:
+            return False
+        self.cancel_until(0)
+        literals = set(literals)
+        # every variable mentioned gets a value in the model, even in a
+        # clause that is dropped below
+        for literal in literals:
+            self.ensure(literal)
+        if any(-literal in literals for literal in literals):
+            return True
+        clause = []
+        for literal in literals:
+            lit = internal(literal)
+            if self.value[lit] is True:
+                # already satisfied for good
+                return True
+            if self.value[lit] is None:
+                clause.append(lit)
+
+        if not clause:
+            self.ok = False
+        elif len(clause) == 1:
+            self.assign(clause[0], None)
+            self.ok = self.propagate() is None
+        else:
+            self.attach(clause)
+            self.clauses.append(clause)
+        return self.ok
+
+    def attach(self, clause):
+        self.watches[clause[0]].append(clause)
+        self.watches[clause[1]].append(clause)
+
+    def decision_level(self):
+        return len(self.trail_lim)
+
+    def assign(self, lit, reason):
+        v = lit >> 1
+        self.value[lit] = True
+        self.value[lit ^ 1] = False
+        self.level[v] = len(self.trail_lim)
+        self.reason[v] = reason
+        self.trail.append(lit)
+
+    def cancel_until(self, level):
+        if len(self.trail_lim) <= level:
+            return
+        value, phase, activity = self.value, self.phase, self.activity
+        start = self.trail_lim[level]
+        for lit in self.trail[start:]:
+            v = lit >> 1
+            value[lit] = value[lit ^ 1] = None
+            phase[v] = not lit & 1
+            self.reason[v] = None
+            heapq.heappush(self.order, (-activity[v], v))
+        del self.trail[start:]
+        del self.trail_lim[level:]
+        self.queue_head = start
+
+        # drop outdated entries before the heap gets much larger than needed
+        if len(self.order) > 4 * len(activity) + 64:
+            self.order = [(-activity[v], v) for v in range(len(activity))
+                          if value[2 * v] is None]
+            heapq.heapify(self.order)
+
+    def propagate(self):
+        """
+        Unit propagation over the watched literals. Returns a conflicting
+        clause, or None.
+        """
+        value, watches, trail = self.value, self.watches, self.trail
+        while self.queue_head < len(trail):
+            false_lit = trail[self.queue_head] ^ 1
+            self.queue_head += 1
+            self.propagations += 1
+            watching = watches[false_lit]
+            kept = []
+            watches[false_lit] = kept
+            for i, clause in enumerate(watching):
+                # keep the false literal in slot 1
+                if clause[0] == false_lit:
+                    clause[0], clause[1] = clause[1], false_lit
+                first = clause[0]
+                if value[first] is True:
+                    kept.append(clause)
+                    continue
+
+                # look for another literal to watch
+                for k in range(2, len(clause)):
+                    if value[clause[k]] is not False:
+                        clause[1], clause[k] = clause[k], false_lit
+                        watches[clause[1]].append(clause)
+                        break
+                else:
+                    kept.append(clause)
+                    if value[first] is False:
+                        kept.extend(watching[i + 1:])
+                        self.queue_head = len(trail)
+                        return clause
+                    self.assign(first, clause)
+        return None
+
+    def analyze(self, conflict):
+        """
+        Learns a clause from a conflict, cutting at the first unique
+        implication point. Returns the clause (asserting literal first)
+        and the level to backjump to.
+        """
+        level, reason, trail = self.level, self.reason, self.trail
+        current = len(self.trail_lim)
+        seen = set()
+        learned = [None]
+        pending = 0
+        lit = None
+        index = len(trail) - 1
+        clause = conflict
+        while True:
+            for q in (clause if lit is None else clause[1:]):
+                v = q >> 1
+                if v in seen or level[v] == 0:
+                    continue
+                seen.add(v)
+                self.bump(v)
+                if level[v] == current:
+                    pending += 1
+                else:
+                    learned.append(q)
+
+            # next literal on the trail that took part in the conflict
+            while trail[index] >> 1 not in seen:
+                index -= 1
+            lit = trail[index]
+            index -= 1
+            clause = reason[lit >> 1]
+            pending -= 1
+            if pending == 0:
+                break
+        learned[0] = lit ^ 1
+
+        if len(learned) == 1:
+            return learned, 0
+        # watch the literal from the highest remaining level second
+        highest = max(range(1, len(learned)), key=lambda i: level[learned[i] >> 1])
+        learned[1], learned[highest] = learned[highest], learned[1]
+        return learned, level[learned[1] >> 1]
+
+    def bump(self, v):
+        activity = self.activity
+        activity[v] += self.increment
+        if activity[v] > RESCALE:
+            for u in range(len(activity)):
+                activity[u] /= RESCALE
+            self.increment /= RESCALE
+            self.order = [(-activity[u], u) for u in range(len(activity))]
+            heapq.heapify(self.order)
+        elif self.value[2 * v] is None:
+            heapq.heappush(self.order, (-activity[v], v))
+
+    def pick_branch(self):
+        """Unassigned variable with the highest activity, or None."""
+        order, value, activity = self.order, self.value, self.activity
+        while order:
+            score, v = heapq.heappop(order)
+            # skip assigned variables and entries outdated by a bump
+            if value[2 * v] is None and -score == activity[v]:
+                return v
+        for v in range(len(activity)):
+            if value[2 * v] is None:
+                return v
+        return None
+
+    def search(self, conflict_limit, assumptions):
+        """
+        CDCL until a model is found (True), the clauses are refuted
+        (False), or conflict_limit conflicts pass (None, for a restart).
+        The internal literals in assumptions are decided first, in order.
+        """
+        conflicts = 0
+        while True:
+            conflict = self.propagate()
+            if conflict is not None:
+                self.conflicts += 1
+                conflicts += 1
+                if not self.trail_lim:
+                    self.ok = False
+                    return False
+                learned, level = self.analyze(conflict)
+                self.cancel_until(level)
+                if len(learned) == 1:
+                    self.assign(learned[0], None)
+                else:
+                    self.attach(learned)
+                    self.learned.append(learned)
+                    self.assign(learned[0], learned)
+                self.increment /= DECAY
+                continue
+
+            if conflicts >= conflict_limit:
+                self.cancel_until(0)
+                return None
+
+            # each assumption gets its own decision level, even when it
+            # already holds, so levels and assumptions stay aligned
+            lit = None
+            while len(self.trail_lim) < len(assumptions):
+                assumption = assumptions[len(self.trail_lim)]
+                if self.value[assumption] is False:
+                    return False
+                self.trail_lim.append(len(self.trail))
+                if self.value[assumption] is None:
+                    lit = assumption
+                    break
+            if lit is None:
+                v = self.pick_branch()
+                if v is None:
+                    return True
+                lit = 2 * v + (not self.phase[v])
+                self.trail_lim.append(len(self.trail))
+            self.decisions += 1
+            self.assign(lit, None)
+
+    def solve(self, assumptions=()):
+        """
+        Returns True and sets `model` if the clauses are satisfiable with
+        every DIMACS literal in assumptions true, else False. Only a False
+        without assumptions means the clauses themselves are unsatisfiable.
+        """
+        self.model = None
+        if not self.ok:
+            return False
+        self.cancel_until(0)
+        if self.propagate() is not None:
+            self.ok = False
+            return False
+        for literal in assumptions:
+            self.ensure(literal)
+        assumptions = [internal(literal) for literal in assumptions]
+
+        restarts = 0
+        while True:
+            result = self.search(RESTART_BASE * luby(restarts), assumptions)
+            restarts += 1
+            if result is None:
+                continue
+            if result:
+                self.model = [self.value[2 * v] for v in range(len(self.level))]
+            self.cancel_until(0)
+            return result
+
+    def model_value(self, literal):
+        """Value of a DIMACS literal in the last model found."""
+        value = self.model[abs(literal) - 1]
+        return value if literal > 0 else not value
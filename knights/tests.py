@@ -0,0 +1,173 @@
+import copy
+import itertools
+import pickle
+import random
+
+from logic import *
+from sat import Solver
+from puzzle import (AKnight, AKnave, BKnight, BKnave, CKnight, CKnave,
+                    knowledge0, knowledge1, knowledge2, knowledge3)
+
+
+def satisfiable(n, clauses):
+    """Brute force: does any assignment of n variables satisfy the clauses?"""
+    for values in itertools.product((False, True), repeat=n):
+        if all(any(values[abs(l) - 1] == (l > 0) for l in clause)
+               for clause in clauses):
+            return True
+    return False
+
+
+def random_clauses(rng, n):
+    return [[rng.choice((1, -1)) * rng.randint(1, n)
+             for _ in range(rng.randint(1, 3))]
+            for _ in range(rng.randint(1, 5 * n))]
+
+
+def random_sentence(rng, symbols, depth):
+    if depth == 0 or rng.random() < 0.2:
+        symbol = rng.choice(symbols)
+        return symbol if rng.random() < 0.7 else Not(symbol)
+    kind = rng.choice("naoib")
+    if kind == "n":
+        return Not(random_sentence(rng, symbols, depth - 1))
+    if kind == "a":
+        return And(*[random_sentence(rng, symbols, depth - 1)
+                     for _ in range(rng.randint(1, 3))])
+    if kind == "o":
+        return Or(*[random_sentence(rng, symbols, depth - 1)
+                    for _ in range(rng.randint(1, 3))])
+    if kind == "i":
+        return Implication(random_sentence(rng, symbols, depth - 1),
+                           random_sentence(rng, symbols, depth - 1))
+    return Biconditional(random_sentence(rng, symbols, depth - 1),
+                         random_sentence(rng, symbols, depth - 1))
+
+
+# sat solver: random 1-3 literal clauses against brute force
+rng = random.Random(1)
+for trial in range(1000):
+    n = rng.randint(1, 10)
+    clauses = random_clauses(rng, n)
+    solver = Solver()
+    for clause in clauses:
+        solver.add_clause(clause)
+    solver.ensure(n)
+    result = solver.solve()
+    assert result == satisfiable(n, clauses), clauses
+    if result:
+        assert all(any(solver.model_value(l) for l in clause) for clause in clauses)
+
+    # the same solver under assumptions, then without them again
+    for _ in range(3):
+        assumptions = [rng.choice((1, -1)) * v
+                       for v in rng.sample(range(1, n + 1), rng.randint(0, min(3, n)))]
+        result = solver.solve(assumptions)
+        assert result == satisfiable(n, clauses + [[a] for a in assumptions]), (clauses, assumptions)
+        if result:
+            assert all(solver.model_value(a) for a in assumptions)
+    assert solver.solve() == satisfiable(n, clauses)
+print("sat solver agrees with brute force")
+
+
+# entailment: every backend against model_check_recursive
+for interned in (False, True):
+    set_interning(interned)
+    rng = random.Random(3)
+    for trial in range(500):
+        symbols = [Symbol(f"s{i}") for i in range(rng.randint(1, 6))]
+        conjuncts = [random_sentence(rng, symbols, 3) for _ in range(rng.randint(1, 4))]
+        knowledge = And(*conjuncts)
+        query = random_sentence(rng, symbols, 2)
+        names = sorted(set.union(knowledge.symbols(), query.symbols()))
+
+        expected = model_check_recursive(knowledge, query)
+        assert model_check(knowledge, query) == expected, (knowledge, query)
+        assert sat_check(knowledge, query) == expected, (knowledge, query)
+        assert compiled_check(knowledge, query) == expected, (knowledge, query)
+        # small chunks, so symbols past the first chunk are exercised too
+        assert TruthTable(names, chunk_bits=2).entails(knowledge, query) == expected
+
+        kb = KnowledgeBase()
+        for conjunct in conjuncts:
+            kb.add(conjunct)
+        assert kb.entails(query) == expected, (knowledge, query)
+        # asked again, now answered from the models it kept
+        assert kb.entails(query) == expected, (knowledge, query)
+
+        # an assumption is the same as one more conjunct
+        assumption = random_sentence(rng, symbols, 1)
+        assert kb.entails(query, [assumption]) == model_check_recursive(
+            And(knowledge, assumption), query
+        ), (knowledge, assumption, query)
+
+        # models counted by the truth table match brute force
+        count = sum(
+            knowledge.evaluate(dict(zip(names, values)))
+            for values in itertools.product((True, False), repeat=len(names))
+        )
+        assert TruthTable(names, chunk_bits=2).count(knowledge) == count
+set_interning(False)
+print("model_check, sat_check, compiled_check, TruthTable and KnowledgeBase "
+      "agree with model_check_recursive")
+
+
+# sentences deeper than the parser allows nested parentheses still compile
+for interned in (False, True):
+    set_interning(interned)
+    A, B = Symbol("A"), Symbol("B")
+    deep = A
+    for i in range(200):
+        deep = And(deep, B) if i % 2 else Implication(B, deep)
+    for query in (A, B, Not(B), Or(A, Not(A))):
+        assert compiled_check(deep, query) == model_check_recursive(deep, query)
+set_interning(False)
+print("compiled_check handles deep sentences")
+
+
+# interned sentences survive copying and pickling as the same sentence
+set_interning(True)
+A, B = Symbol("A"), Symbol("B")
+sentence = And(A, Or(Not(B), Implication(A, B)), Biconditional(A, B))
+assert copy.copy(sentence) is sentence
+assert copy.deepcopy(sentence) is sentence
+assert pickle.loads(pickle.dumps(sentence)) is sentence
+set_interning(False)
+restored = pickle.loads(pickle.dumps(sentence))
+assert restored == sentence and isinstance(restored, type(sentence))
+assert sentence == And(A, Or(Not(B), Implication(A, B)), Biconditional(A, B))
+print("interned sentences copy and pickle")
+
+
+# a Model forgets memoized values however it is changed
+set_interning(True)
+A, B = Symbol("A"), Symbol("B")
+sentence = And(A, Not(B))
+model = Model(A=True, B=False)
+assert sentence.evaluate(model)
+model.update(B=True)
+assert not sentence.evaluate(model)
+model.pop("B")
+model.setdefault("B", False)
+assert sentence.evaluate(model)
+model |= {"A": False}
+assert not sentence.evaluate(model)
+del model["A"]
+model["A"] = True
+assert sentence.evaluate(model)
+set_interning(False)
+print("Model clears its memo on every change")
+
+
+# the puzzles
+symbols = [AKnight, AKnave, BKnight, BKnave, CKnight, CKnave]
+answers = [
+    (knowledge0, {AKnave}),
+    (knowledge1, {AKnave, BKnight}),
+    (knowledge2, {AKnave, BKnight}),
+    (knowledge3, {AKnight, BKnave, CKnight}),
+]
+for knowledge, expected in answers:
+    for check in (model_check, sat_check, model_check_recursive):
+        assert {s for s in symbols if check(knowledge, s)} == expected, check
+print("puzzles solved")